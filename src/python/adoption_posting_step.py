@@ -1,11 +1,7 @@
 # src/python/adoption_posting.step.py
-import sys
-import os
 import time
 
-# Add parent directory to path for imports
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.services.pet_store import get
+from src.services.bootstrap import services
 
 config = {
     "type": "event",
@@ -57,7 +53,7 @@ async def handler(input_data, ctx=None):
         logger.info('🏠 Adoption Posting triggered', {'petId': pet_id})
 
     try:
-        pet = get(pet_id)
+        pet = await services.store.get(pet_id)
         if not pet:
             if logger:
                 logger.error('❌ Pet not found for adoption posting', {'petId': pet_id})
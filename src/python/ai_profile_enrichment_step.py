@@ -1,6 +1,14 @@
 # src/python/ai_profile_enrichment.step.py
 import json
 import asyncio
+import os
+import urllib.error
+import urllib.request
+
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
 
 config = {
     "type": "event",
@@ -31,14 +39,6 @@ async def handler(input_data, ctx=None):
         })
 
     try:
-        # Import pet store
-        import sys
-        import os
-        sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-        from src.services.pet_store import update_profile
-        import urllib.request
-        import urllib.error
-
         # Get OpenAI API key from environment
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
@@ -117,7 +117,7 @@ Keep it positive, realistic, and adoption-focused."""
                 logger.warn('⚠️ AI response parsing failed, using fallback profile', {'petId': pet_id, 'parseError': str(parse_error)})
 
         # Update pet with AI-generated profile
-        updated_pet = update_profile(pet_id, profile)
+        updated_pet = await services.store.update_profile(pet_id, profile)
         
         if not updated_pet:
             raise Exception(f'Pet not found: {pet_id}')
@@ -168,11 +168,7 @@ Keep it positive, realistic, and adoption-focused."""
 
         # Still update with fallback profile
         try:
-            import sys
-            import os
-            sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-            from src.services.pet_store import update_profile
-            update_profile(pet_id, fallback_profile)
+            await services.store.update_profile(pet_id, fallback_profile)
         except:
             pass
 
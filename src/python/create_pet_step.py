@@ -1,5 +1,11 @@
 # src/python/create_pet.step.py
 import asyncio
+import time
+
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
 
 config = {
     "type": "api",
@@ -16,14 +22,7 @@ async def handler(req, ctx=None):
     streams = getattr(ctx, 'streams', None) if ctx else None
     trace_id = getattr(ctx, 'traceId', None) if ctx else None
     
-    try:
-        import sys
-        import os
-        import time
-        sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-        from src.services.pet_store import create
-    except ImportError:
-        # Fallback for import issues
+    if services is None:
         return {"status": 500, "body": {"message": "Import error"}}
     
     b = (req.get("body") or {})
@@ -43,7 +42,7 @@ async def handler(req, ctx=None):
         return {"status": 400, "body": {"message": "Invalid ageMonths"}}
     
     # Create the pet
-    pet = create(name, species, age_val, weight_kg=weight_kg, symptoms=symptoms)
+    pet = await services.store.create(name, species, age_val, weight_kg=weight_kg, symptoms=symptoms)
     
     if logger:
         logger.info('🐾 Pet created', {
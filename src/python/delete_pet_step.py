@@ -1,21 +1,22 @@
 # src/python/delete_pet.step.py
+import time
+
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
+
 config = { "type":"api", "name":"PyDeletePet", "path":"/py/pets/:id", "method":"DELETE", "emits": [], "flows": ["PyPetManagement"] }
 
 async def handler(req, ctx=None):
     logger = getattr(ctx, 'logger', None) if ctx else None
     emit = getattr(ctx, 'emit', None) if ctx else None
     
-    try:
-        import sys
-        import os
-        import time
-        sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-        from src.services.pet_store import soft_delete
-    except ImportError:
+    if services is None:
         return {"status": 500, "body": {"message": "Import error"}}
     
     pet_id = req.get("pathParams", {}).get("id")
-    deleted_pet = soft_delete(pet_id)
+    deleted_pet = await services.store.soft_delete(pet_id)
     
     if not deleted_pet:
         return {"status": 404, "body": {"message": "Not found"}}
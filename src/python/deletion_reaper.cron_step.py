@@ -1,4 +1,11 @@
 # src/python/deletion_reaper.cron.step.py
+import time
+
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
+
 config = {
     "type": "cron",
     "name": "PyDeletionReaper",
@@ -12,13 +19,7 @@ async def handler(ctx):
     logger = getattr(ctx, 'logger', None) if ctx else None
     emit = getattr(ctx, 'emit', None) if ctx else None
     
-    try:
-        import sys
-        import os
-        import time
-        sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-        from src.services.pet_store import find_deleted_pets_ready_to_purge, remove
-    except ImportError:
+    if services is None:
         if logger:
             logger.error('❌ Deletion Reaper failed - import error')
         return
@@ -27,7 +28,7 @@ async def handler(ctx):
         logger.info('🔄 Deletion Reaper started - scanning for pets to purge')
 
     try:
-        pets_to_reap = find_deleted_pets_ready_to_purge()
+        pets_to_reap = await services.store.find_deleted_pets_ready_to_purge()
         
         if not pets_to_reap:
             if logger:
@@ -45,9 +46,12 @@ async def handler(ctx):
             return
 
         purged_count = 0
-        
+
+        # Purge the whole batch with a single write
+        results = await services.store.remove_many([pet['id'] for pet in pets_to_reap])
+
         for pet in pets_to_reap:
-            success = remove(pet['id'])
+            success = results.get(pet['id'], False)
             
             if success:
                 purged_count += 1
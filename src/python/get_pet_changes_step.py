@@ -0,0 +1,27 @@
+# src/python/get_pet_changes.step.py
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
+
+config = { "type":"api", "name":"PyListPetChanges", "path":"/py/pets/changes", "method":"GET", "emits": [], "flows": ["PyPetManagement"] }
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+async def handler(req, _ctx=None):
+    if services is None:
+        return {"status": 500, "body": {"message": "Import error"}}
+
+    try:
+        since = int(services.request.query_param(req, "since") or 0)
+        limit = int(services.request.query_param(req, "limit") or DEFAULT_PAGE_SIZE)
+    except ValueError:
+        return {"status": 400, "body": {"message": "since and limit must be integers"}}
+    if since < 0:
+        return {"status": 400, "body": {"message": "since must not be negative"}}
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return {"status": 400, "body": {"message": f"limit must be between 1 and {MAX_PAGE_SIZE}"}}
+
+    # {"changes": [...], "nextSince": n, "reset": bool}; pass nextSince back as since
+    return {"status": 200, "body": await services.store.changes_since(since, limit)}
@@ -0,0 +1,21 @@
+# src/python/get_pet_stats.step.py
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
+
+config = { "type":"api", "name":"PyPetStats", "path":"/py/pets/stats", "method":"GET", "emits": [], "flows": ["PyPetManagement"] }
+
+async def handler(req, _ctx=None):
+    if services is None:
+        return {"status": 500, "body": {"message": "Import error"}}
+
+    check = services.request.query_param(req, "check")
+
+    # {"total", "byStatus", "bySpecies", "averageAgeMonths"}, read from the live counters
+    body = dict(await services.store.stats())
+    if check in ("1", "true"):
+        # Recounts every pet; for spot checks, not dashboards. {"result": "ok" |
+        # "drift" | "inconclusive", "attempts", "drift": [...]}
+        body["check"] = await services.store.check_stats()
+    return {"status": 200, "body": body}
@@ -1,14 +1,30 @@
 # src/python/get_pet.step.py
+import zlib
+
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
+
 config = { "type":"api", "name":"PyGetPet", "path":"/py/pets/:id", "method":"GET", "emits": [], "flows": ["PyPetManagement"] }
 
 async def handler(req, _ctx=None):
-    try:
-        import sys
-        import os
-        sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-        from src.services.pet_store import get
-    except ImportError:
+    if services is None:
         return {"status": 500, "body": {"message": "Import error"}}
     pid = req.get("pathParams", {}).get("id")
-    pet = get(pid)
-    return {"status": 200, "body": pet} if pet else {"status": 404, "body": {"message": "Not found"}}
+    fields = services.request.query_fields(req)
+    if fields is not None and (not fields or fields - services.pet_fields):
+        return {"status": 400, "body": {"message": f"Invalid fields: {', '.join(sorted(fields - services.pet_fields)) or 'none given'}"}}
+
+    # The tag is read before the pet, so a body is never newer than its ETag
+    tag = await services.store.pet_version_tag(pid)
+    if tag is None:
+        return {"status": 404, "body": {"message": "Not found"}}
+    etag = f'"{tag}-{zlib.crc32(",".join(sorted(fields or [])).encode()):08x}"'
+    if services.request.etag_matches(req, etag):
+        return {"status": 304, "headers": {"ETag": etag}, "body": None}
+
+    pet = await services.store.get(pid, fields)
+    if not pet:
+        return {"status": 404, "body": {"message": "Not found"}}
+    return {"status": 200, "headers": {"ETag": etag}, "body": pet}
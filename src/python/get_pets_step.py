@@ -1,12 +1,86 @@
 # src/python/get_pets.step.py
+import json
+import zlib
+
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
+
 config = { "type":"api", "name":"PyListPets", "path":"/py/pets", "method":"GET", "emits": [], "flows": ["PyPetManagement"] }
 
-async def handler(_req, _ctx=None):
-    try:
-        import sys
-        import os
-        sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-        from src.services.pet_store import list_all
-    except ImportError:
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def query_filters(req):
+    # ?status=&species=&minAgeMonths=&maxAgeMonths= -> (filters, error message)
+    filters = {}
+    for name, allowed in (("status", services.pet_statuses), ("species", services.pet_species)):
+        value = services.request.query_param(req, name)
+        if value is None:
+            continue
+        if value not in allowed:
+            return None, f"{name} must be one of {', '.join(sorted(allowed))}"
+        filters[name] = value
+    for name in ("minAgeMonths", "maxAgeMonths"):
+        value = services.request.query_param(req, name)
+        if value is None:
+            continue
+        try:
+            filters[name] = int(value)
+        except ValueError:
+            return None, f"{name} must be an integer"
+        if filters[name] < 0:
+            return None, f"{name} must not be negative"
+    if filters.get("minAgeMonths", 0) > filters.get("maxAgeMonths", filters.get("minAgeMonths", 0)):
+        return None, "minAgeMonths must not exceed maxAgeMonths"
+    return filters, None
+
+async def handler(req, _ctx=None):
+    if services is None:
         return {"status": 500, "body": {"message": "Import error"}}
-    return {"status": 200, "body": list_all()}
+
+    limit = services.request.query_param(req, "limit")
+    cursor = services.request.query_param(req, "cursor")
+    fields = services.request.query_fields(req)
+    if fields is not None and (not fields or fields - services.pet_fields):
+        return {"status": 400, "body": {"message": f"Invalid fields: {', '.join(sorted(fields - services.pet_fields)) or 'none given'}"}}
+    filters, error = query_filters(req)
+    if error:
+        return {"status": 400, "body": {"message": error}}
+
+    output_format = services.request.query_param(req, "format") or "json"
+    if output_format not in ("json", "ndjson"):
+        return {"status": 400, "body": {"message": "format must be json or ndjson"}}
+    paged = limit is not None or cursor is not None
+    if output_format == "ndjson" and paged:
+        return {"status": 400, "body": {"message": "format=ndjson returns the full listing; drop limit and cursor"}}
+    try:
+        limit_val = int(limit) if limit is not None else DEFAULT_PAGE_SIZE
+    except ValueError:
+        return {"status": 400, "body": {"message": "Invalid limit"}}
+    if limit_val < 1 or limit_val > MAX_PAGE_SIZE:
+        return {"status": 400, "body": {"message": f"limit must be between 1 and {MAX_PAGE_SIZE}"}}
+
+    # The tag is read before the pets, so a body is never newer than its ETag
+    variant = f"{','.join(sorted(fields or []))}|{limit}|{cursor}|{output_format}|{sorted(filters.items())}"
+    etag = f'"{await services.store.version_tag()}-{zlib.crc32(variant.encode()):08x}"'
+    if services.request.etag_matches(req, etag):
+        return {"status": 304, "headers": {"ETag": etag}, "body": None}
+
+    # Full listing as one JSON object per line. Step responses are not
+    # streamed, so the encoded body is built in full; only the decoded pets
+    # are read one batch at a time.
+    if output_format == "ndjson":
+        lines = [json.dumps(pet) + "\n" async for pet in services.store.iter_all(fields, filters=filters)]
+        return {"status": 200, "headers": {"Content-Type": "application/x-ndjson", "ETag": etag}, "body": "".join(lines)}
+
+    # Without paging parameters keep returning the plain array
+    if not paged:
+        return {"status": 200, "headers": {"ETag": etag}, "body": await services.store.list_all(fields, filters)}
+
+    try:
+        page = await services.store.list_page(limit_val, cursor or None, fields, filters)
+    except ValueError:
+        return {"status": 400, "body": {"message": "Invalid cursor"}}
+    return {"status": 200, "headers": {"ETag": etag}, "body": page}
@@ -0,0 +1,14 @@
+# src/python/get_progression_metrics.step.py
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
+
+config = { "type":"api", "name":"PyProgressionMetrics", "path":"/py/pets/progressions", "method":"GET", "emits": [], "flows": ["PyPetManagement"] }
+
+async def handler(req, _ctx=None):
+    if services is None:
+        return {"status": 500, "body": {"message": "Import error"}}
+
+    # {"pending", "overdue", "oldestOverdueMs", "fired", "lagMs": {"p50", "p99", "max"}, "tickMs"}
+    return {"status": 200, "body": await services.store.progression_stats()}
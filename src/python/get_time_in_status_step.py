@@ -0,0 +1,18 @@
+# src/python/get_time_in_status.step.py
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
+
+config = { "type":"api", "name":"PyTimeInStatus", "path":"/py/pets/time-in-status", "method":"GET", "emits": [], "flows": ["PyPetManagement"] }
+
+async def handler(req, _ctx=None):
+    if services is None:
+        return {"status": 500, "body": {"message": "Import error"}}
+
+    species = services.request.query_param(req, "species")
+    if species is not None and species not in services.pet_species:
+        return {"status": 400, "body": {"message": f"species must be one of {', '.join(sorted(services.pet_species))}"}}
+
+    # species -> status -> {"count", "p50Ms", "p90Ms", "p99Ms"} over completed stays
+    return {"status": 200, "body": await services.store.time_in_status(species)}
@@ -1,11 +1,11 @@
 # src/python/health_review_agent.step.py
-import sys
+import json
 import os
 import time
+import urllib.error
+import urllib.request
 
-# Add parent directory to path for imports
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.services.pet_store import get
+from src.services.bootstrap import services
 
 config = {
     "type": "api",
@@ -47,11 +47,6 @@ def build_agent_context(pet):
     }
 
 async def call_agent_decision(agent_type, context, available_emits, logger):
-    import json
-    import urllib.request
-    import urllib.parse
-    import urllib.error
-    
     artifact = {
         "petId": context["petId"],
         "agentType": agent_type,
@@ -231,7 +226,7 @@ async def handler(req, ctx=None):
         return {"status": 400, "body": {"message": "Pet ID is required"}}
 
     # Get pet
-    pet = get(pet_id)
+    pet = await services.store.get(pet_id)
     if not pet:
         return {"status": 404, "body": {"message": "Pet not found"}}
 
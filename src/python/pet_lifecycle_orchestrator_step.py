@@ -1,4 +1,24 @@
 # src/python/pet_lifecycle_orchestrator.step.py
+import asyncio
+import time
+
+try:
+    from src.services.bootstrap import services
+    from src.services.pet_mailbox import MAX_CONCURRENT_PETS, PetMailboxes
+    from src.services.pet_timers import TICK_MS, delay_ms as progression_delay_ms
+except ImportError:  # not started from the project root
+    services = None
+
+# One mailbox per pet: a pet's events run in arrival order, different pets in parallel
+MAILBOXES = PetMailboxes(MAX_CONCURRENT_PETS) if services is not None else None
+
+# Status -> automatic next status; the delays come from PET_PROGRESSION_DELAYS_MS
+AUTOMATIC_PROGRESSIONS = {
+    'healthy': {'to': 'available', 'description': 'Automatic progression - pet ready for adoption'},
+    'ill': {'to': 'under_treatment', 'description': 'Automatic progression - treatment started'},
+    'recovered': {'to': 'healthy', 'description': 'Automatic progression - recovery complete'}
+}
+_timer_task = None
 
 # Guard checking functions
 def check_guards(pet, guards):
@@ -105,6 +125,60 @@ TRANSITION_RULES = [
     }
 ]
 
+# Events that name the status they want (requestedStatus) and are looked up by
+# (event, from, to); every other event is looked up by (event, from) alone
+TARGETED_EVENTS = {'status.update.requested'}
+INITIAL_STATUS = 'new'
+# Set outside the orchestrator (soft delete), so no rule has to reach it
+EXTERNAL_STATUSES = {'deleted'}
+KNOWN_GUARDS = {'must_be_healthy', 'no_needs_data_flag'}
+
+def compile_rules(rules, statuses=None):
+    """Index the rules by (event, from) and (event, from, to); raise on a bad rule set"""
+    by_event_from, by_target, problems = {}, {}, []
+    for rule in rules:
+        for guard in rule.get('guards', []):
+            if guard not in KNOWN_GUARDS:
+                problems.append(f"{rule['event']} -> {rule['to']}: unknown guard {guard}")
+        for from_status in rule['from']:
+            target = (rule['event'], from_status, rule['to'])
+            if target in by_target:
+                problems.append(f"{rule['event']}: {from_status} -> {rule['to']} is defined twice")
+            by_target[target] = rule
+            if rule['event'] in TARGETED_EVENTS:
+                continue
+            other = by_event_from.get((rule['event'], from_status))
+            if other is not None and other['to'] != rule['to']:
+                problems.append(f"{rule['event']}: {from_status} leads to both {other['to']} and {rule['to']}")
+            by_event_from[(rule['event'], from_status)] = rule
+
+    # Every status the rules start from (and every known one) must be reachable from INITIAL_STATUS
+    edges = {}
+    for rule in rules:
+        for from_status in rule['from']:
+            edges.setdefault(from_status, set()).add(rule['to'])
+    reachable, frontier = {INITIAL_STATUS}, [INITIAL_STATUS]
+    while frontier:
+        for to_status in edges.get(frontier.pop(), ()):
+            if to_status not in reachable:
+                reachable.add(to_status)
+                frontier.append(to_status)
+    expected = set(edges) | (set(statuses or ()) - EXTERNAL_STATUSES)
+    for status in sorted(expected - reachable):
+        problems.append(f"{status} is unreachable from {INITIAL_STATUS}")
+    if statuses is not None:
+        for status in sorted((set(edges) | reachable) - set(statuses)):
+            problems.append(f"{status} is not a pet status")
+
+    if problems:
+        raise ValueError('Invalid TRANSITION_RULES: ' + '; '.join(problems))
+    return by_event_from, by_target
+
+# Compiled once per worker, so a bad rule set fails when the step loads
+RULES_BY_EVENT_FROM, RULES_BY_TARGET = compile_rules(
+    TRANSITION_RULES, services.pet_statuses if services is not None else None
+)
+
 config = {
     "type": "event",
     "name": "PyPetLifecycleOrchestrator",
@@ -126,20 +200,22 @@ config = {
 }
 
 async def handler(input_data, ctx=None):
-    logger = getattr(ctx, 'logger', None) if ctx else None
-    emit = getattr(ctx, 'emit', None) if ctx else None
-    
-    try:
-        import sys
-        import os
-        import time
-        sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-        from src.services.pet_store import get, update_status, add_flag, remove_flag
-    except ImportError:
+    if services is None:
+        logger = getattr(ctx, 'logger', None) if ctx else None
         if logger:
             logger.error('❌ Lifecycle orchestrator failed - import error')
         return
 
+    # Progressions restored from disk fire once any event wakes the worker
+    start_timer_loop(getattr(ctx, 'emit', None) if ctx else None, getattr(ctx, 'logger', None) if ctx else None)
+
+    # Waits behind any earlier event for the same pet
+    await MAILBOXES.run(input_data.get('petId'), process_event, input_data, ctx)
+
+async def process_event(input_data, ctx=None):
+    logger = getattr(ctx, 'logger', None) if ctx else None
+    emit = getattr(ctx, 'emit', None) if ctx else None
+
     pet_id = input_data.get('petId')
     event_type = input_data.get('event')
     requested_status = input_data.get('requestedStatus')
@@ -150,31 +226,33 @@ async def handler(input_data, ctx=None):
         logger.info(log_message, {'petId': pet_id, 'eventType': event_type, 'requestedStatus': requested_status, 'automatic': automatic})
 
     try:
-        pet = get(pet_id)
+        pet = await services.store.get(pet_id)
         if not pet:
             if logger:
                 logger.error('❌ Pet not found for lifecycle transition', {'petId': pet_id, 'eventType': event_type})
             return
 
-        # For status update requests, find the rule based on requested status
-        rule = None
-        if event_type == 'status.update.requested' and requested_status:
-            for r in TRANSITION_RULES:
-                if (r['event'] == event_type and 
-                    pet['status'] in r['from'] and 
-                    r['to'] == requested_status):
-                    rule = r
-                    break
+        # An automatic progression is only valid for the status it was scheduled from
+        expected_status = input_data.get('currentStatus')
+        if automatic and expected_status and pet['status'] != expected_status:
+            if logger:
+                logger.warn('⚠️ Automatic progression skipped - pet status changed', {
+                    'petId': pet_id,
+                    'expectedStatus': expected_status,
+                    'actualStatus': pet['status']
+                })
+            return
+
+        # Status update requests name their target; other events (like
+        # feeding.reminder.completed) have at most one rule per current status
+        if event_type in TARGETED_EVENTS:
+            rule = RULES_BY_TARGET.get((event_type, pet['status'], requested_status))
         else:
-            # For other events (like feeding.reminder.completed)
-            for r in TRANSITION_RULES:
-                if r['event'] == event_type and pet['status'] in r['from']:
-                    rule = r
-                    break
+            rule = RULES_BY_EVENT_FROM.get((event_type, pet['status']))
 
         if not rule:
             reason = (f"Invalid transition: cannot change from {pet['status']} to {requested_status}" 
-                     if event_type == 'status.update.requested' 
+                     if event_type in TARGETED_EVENTS
                      else f"No transition rule found for {event_type} from {pet['status']}")
                 
             if logger:
@@ -238,22 +316,29 @@ async def handler(input_data, ctx=None):
 
         # Apply the transition
         old_status = pet['status']
-        updated_pet = update_status(pet_id, rule['to'])
+        updated_pet = await services.store.update_status(pet_id, rule['to'])
         
         if not updated_pet:
             if logger:
                 logger.error('❌ Failed to update pet status', {'petId': pet_id, 'oldStatus': old_status, 'newStatus': rule['to']})
             return
 
+        if old_status != rule['to']:
+            try:
+                await services.store.record_transition(pet, rule['to'], updated_pet['updatedAt'])
+            except Exception as error:
+                if logger:
+                    logger.warn('⚠️ Failed to record status history', {'petId': pet_id, 'error': str(error)})
+
         # Apply flag actions if present
         if rule.get('flagAction'):
             flag_action = rule['flagAction']
             if flag_action['action'] == 'add':
-                updated_pet = add_flag(pet_id, flag_action['flag'])
+                updated_pet = await services.store.add_flag(pet_id, flag_action['flag'])
                 if logger:
                     logger.info('🏷️ Flag added by orchestrator', {'petId': pet_id, 'flag': flag_action['flag']})
             elif flag_action['action'] == 'remove':
-                updated_pet = remove_flag(pet_id, flag_action['flag'])
+                updated_pet = await services.store.remove_flag(pet_id, flag_action['flag'])
                 if logger:
                     logger.info('🏷️ Flag removed by orchestrator', {'petId': pet_id, 'flag': flag_action['flag']})
 
@@ -292,7 +377,6 @@ async def handler(input_data, ctx=None):
 
 async def emit_next_action_events(pet_id, new_status, old_status, pet, emit, logger):
     try:
-        import time
         # Emit specific next action events based on status change
         if new_status == 'under_treatment' and old_status == 'ill':
             await emit({
@@ -353,52 +437,69 @@ async def emit_next_action_events(pet_id, new_status, old_status, pet, emit, log
             logger.error('❌ Failed to emit next action events', {'petId': pet_id, 'newStatus': new_status, 'error': str(error)})
 
 async def check_automatic_progressions(pet_id, current_status, emit, logger):
-    # Define automatic progressions
-    automatic_progressions = {
-        'healthy': {'to': 'available', 'description': 'Automatic progression - pet ready for adoption'},
-        'ill': {'to': 'under_treatment', 'description': 'Automatic progression - treatment started'},
-        'recovered': {'to': 'healthy', 'description': 'Automatic progression - recovery complete'}
-    }
-
-    progression = automatic_progressions.get(current_status)
+    progression = AUTOMATIC_PROGRESSIONS.get(current_status)
     if progression:
+        delay = progression_delay_ms(current_status)
         if logger:
             logger.info('🤖 Orchestrator triggering automatic progression', {
                 'petId': pet_id,
                 'currentStatus': current_status,
-                'nextStatus': progression['to']
+                'nextStatus': progression['to'],
+                'delayMs': delay
             })
 
-        # Emit automatic progression event with delay
-        import asyncio
-        async def delayed_emit():
-            await asyncio.sleep(1.5)  # Slightly longer delay to ensure current transition completes
-            # Get fresh pet status to ensure we have the latest state
-            try:
-                import sys
-                import os
-                sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-                from src.services.pet_store import get
-                fresh_pet = get(pet_id)
-                if fresh_pet and fresh_pet['status'] == current_status:
-                    await emit({
-                        'topic': 'py.pet.status.update.requested',
-                        'data': {
-                            'petId': pet_id,
-                            'event': 'status.update.requested',
-                            'requestedStatus': progression['to'],
-                            'currentStatus': fresh_pet['status'],
-                            'automatic': True
-                        }
-                    })
-                elif logger:
-                    logger.warn('⚠️ Automatic progression skipped - pet status changed', {
-                        'petId': pet_id,
-                        'expectedStatus': current_status,
-                        'actualStatus': fresh_pet['status'] if fresh_pet else None
-                    })
-            except Exception as e:
-                if logger:
-                    logger.error('❌ Automatic progression error', {'petId': pet_id, 'error': str(e)})
-        
-        asyncio.create_task(delayed_emit())
\ No newline at end of file
+        # A durable timer instead of a sleeping task; it survives a restart and
+        # replaces any progression still pending for this pet
+        try:
+            due = int(time.time() * 1000) + delay
+            await services.store.schedule_progression(pet_id, current_status, progression['to'], due)
+            start_timer_loop(emit, logger)
+        except Exception as e:
+            if logger:
+                logger.error('❌ Automatic progression error', {'petId': pet_id, 'error': str(e)})
+
+def start_timer_loop(emit, logger):
+    # One loop per worker fires every due progression; it stops once none are pending
+    global _timer_task
+    if emit and (_timer_task is None or _timer_task.done()):
+        _timer_task = asyncio.get_running_loop().create_task(run_timer_loop(emit, logger))
+
+async def run_timer_loop(emit, logger):
+    while True:
+        await asyncio.sleep(TICK_MS / 1000)
+        try:
+            fired = await fire_due_progressions(emit, logger)
+            if not fired and not await services.store.pending_progressions():
+                return
+        except Exception as e:
+            if logger:
+                logger.error('❌ Progression timer error', {'error': str(e)})
+
+async def fire_due_progressions(emit, logger):
+    # Emits one batch of due progressions; each event queues in its pet's
+    # mailbox and is skipped there if the pet has left the status it was
+    # scheduled from. Only emitted ones are acked: the rest fire again once
+    # their lease runs out.
+    batch = await services.store.take_due_progressions()
+    results = await asyncio.gather(*[
+        emit({
+            'topic': 'py.pet.status.update.requested',
+            'data': {
+                'petId': item['petId'],
+                'event': 'status.update.requested',
+                'requestedStatus': item['to'],
+                'currentStatus': item['from'],
+                'automatic': True
+            }
+        })
+        for item in batch
+    ], return_exceptions=True)
+    emitted = [item for item, result in zip(batch, results) if not isinstance(result, BaseException)]
+    await services.store.ack_progressions(emitted)
+    if logger:
+        if emitted:
+            logger.info('⏰ Automatic progressions fired', {'count': len(emitted)})
+        if len(emitted) < len(batch):
+            errors = [str(result) for result in results if isinstance(result, BaseException)]
+            logger.error('❌ Automatic progressions not emitted, retried after their lease', {'count': len(errors), 'error': errors[0]})
+    return len(batch)
@@ -0,0 +1,66 @@
+# src/python/progression_timers.cron.step.py
+import time
+
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
+
+config = {
+    "type": "cron",
+    "name": "PyProgressionTimers",
+    "description": "Fires automatic status progressions that came due while no orchestrator loop was running (e.g. after a restart)",
+    "cron": "* * * * *",  # Every minute
+    "emits": ["py.pet.status.update.requested"],
+    "flows": ["PyPetManagement"]
+}
+
+async def handler(ctx):
+    logger = getattr(ctx, 'logger', None) if ctx else None
+    emit = getattr(ctx, 'emit', None) if ctx else None
+
+    if services is None:
+        if logger:
+            logger.error('❌ Progression timers failed - import error')
+        return
+
+    try:
+        fired = 0
+        # Batch by batch until nothing is due; the orchestrator's own loop may
+        # take some of them, each progression is leased to one worker at a
+        # time. An emit that raises ends the run; its progression and the
+        # rest of the batch are not acked and fire again after their lease.
+        while emit:
+            batch = await services.store.take_due_progressions()
+            if not batch:
+                break
+            emitted = []
+            try:
+                for item in batch:
+                    await emit({
+                        'topic': 'py.pet.status.update.requested',
+                        'data': {
+                            'petId': item['petId'],
+                            'event': 'status.update.requested',
+                            'requestedStatus': item['to'],
+                            'currentStatus': item['from'],
+                            'automatic': True
+                        }
+                    })
+                    emitted.append(item)
+            finally:
+                await services.store.ack_progressions(emitted)
+            fired += len(batch)
+
+        if fired and logger:
+            stats = await services.store.progression_stats()
+            logger.info('⏰ Overdue progressions fired', {
+                'count': fired,
+                'pending': stats['pending'],
+                'lagMs': stats['lagMs'],
+                'timestamp': int(time.time() * 1000)
+            })
+
+    except Exception as error:
+        if logger:
+            logger.error('❌ Progression timers error', {'error': str(error)})
@@ -1,11 +1,7 @@
 # src/python/recovery_monitor.step.py
-import sys
-import os
 import time
 
-# Add parent directory to path for imports
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.services.pet_store import get
+from src.services.bootstrap import services
 
 config = {
     "type": "event",
@@ -100,7 +96,7 @@ async def handler(input_data, ctx=None):
         logger.info('🩺 Recovery Monitor triggered', {'petId': pet_id, 'treatmentType': treatment_type, 'treatmentStatus': treatment_status})
 
     try:
-        pet = get(pet_id)
+        pet = await services.store.get(pet_id)
         if not pet:
             if logger:
                 logger.error('❌ Pet not found for recovery monitoring', {'petId': pet_id})
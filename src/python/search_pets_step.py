@@ -0,0 +1,30 @@
+# src/python/search_pets.step.py
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
+
+config = { "type":"api", "name":"PySearchPets", "path":"/py/pets/search", "method":"GET", "emits": [], "flows": ["PyPetManagement"] }
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+async def handler(req, _ctx=None):
+    if services is None:
+        return {"status": 500, "body": {"message": "Import error"}}
+
+    q = (services.request.query_param(req, "q") or "").strip()
+    if not q:
+        return {"status": 400, "body": {"message": "q is required"}}
+    fields = services.request.query_fields(req)
+    if fields is not None and (not fields or fields - services.pet_fields):
+        return {"status": 400, "body": {"message": f"Invalid fields: {', '.join(sorted(fields - services.pet_fields)) or 'none given'}"}}
+    try:
+        limit = int(services.request.query_param(req, "limit") or DEFAULT_LIMIT)
+    except ValueError:
+        return {"status": 400, "body": {"message": "Invalid limit"}}
+    if limit < 1 or limit > MAX_LIMIT:
+        return {"status": 400, "body": {"message": f"limit must be between 1 and {MAX_LIMIT}"}}
+
+    # Best match first: [{"score": ..., "pet": {...}}]
+    return {"status": 200, "body": {"items": await services.store.search(q, limit, fields)}}
@@ -1,5 +1,11 @@
 # src/python/set_next_feeding_reminder.job.step.py
 import asyncio
+import time
+
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
 
 config = {
     "type": "event",
@@ -16,13 +22,7 @@ async def handler(input_data, ctx=None):
     streams = getattr(ctx, 'streams', None) if ctx else None
     trace_id = getattr(ctx, 'traceId', None) if ctx else None
     
-    try:
-        import sys
-        import os
-        import time
-        sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-        from src.services.pet_store import update
-    except ImportError:
+    if services is None:
         if logger:
             logger.error('❌ Failed to set feeding reminder - import error')
         return
@@ -44,13 +44,23 @@ async def handler(input_data, ctx=None):
             'status': 'in_quarantine'  # Set status to in_quarantine here
         }
 
-        updated_pet = update(pet_id, updates)
+        # The pet as it was, for the status history: this job, not the
+        # orchestrator, moves it out of 'new', so the stay is recorded here
+        pet = await services.store.get(pet_id)
+        updated_pet = await services.store.update(pet_id, updates)
         
         if not updated_pet:
             if logger:
                 logger.error('❌ Failed to set feeding reminder - pet not found', {'petId': pet_id})
             return
 
+        if pet and pet['status'] != 'in_quarantine':
+            try:
+                await services.store.record_transition(pet, 'in_quarantine', updated_pet['updatedAt'])
+            except Exception as error:
+                if logger:
+                    logger.warn('⚠️ Failed to record status history', {'petId': pet_id, 'error': str(error)})
+
         if logger:
             notes_preview = updated_pet.get('notes', '')[:50] + '...' if updated_pet.get('notes') else ''
             logger.info('✅ Next feeding reminder set', {
@@ -1,11 +1,7 @@
 # src/python/treatment_scheduler.step.py
-import sys
-import os
 import time
 
-# Add parent directory to path for imports
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.services.pet_store import get
+from src.services.bootstrap import services
 
 config = {
     "type": "event",
@@ -73,7 +69,7 @@ async def handler(input_data, ctx=None):
         logger.info('🏥 Treatment Scheduler triggered', {'petId': pet_id, 'symptoms': symptoms, 'urgency': urgency})
 
     try:
-        pet = get(pet_id)
+        pet = await services.store.get(pet_id)
         if not pet:
             if logger:
                 logger.error('❌ Pet not found for treatment scheduling', {'petId': pet_id})
@@ -1,4 +1,9 @@
 # src/python/update_pet.step.py
+try:
+    from src.services.bootstrap import services
+except ImportError:  # not started from the project root
+    services = None
+
 config = { 
     "type": "api", 
     "name": "PyUpdatePet", 
@@ -12,19 +17,14 @@ async def handler(req, ctx=None):
     logger = getattr(ctx, 'logger', None) if ctx else None
     emit = getattr(ctx, 'emit', None) if ctx else None
     
-    try:
-        import sys
-        import os
-        sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-        from src.services.pet_store import get, update
-    except ImportError:
+    if services is None:
         return {"status": 500, "body": {"message": "Import error"}}
     
     pet_id = req.get("pathParams", {}).get("id")
     b = req.get("body") or {}
     
     # Check if pet exists
-    current_pet = get(pet_id)
+    current_pet = await services.store.get(pet_id)
     if not current_pet:
         return {"status": 404, "body": {"message": "Not found"}}
 
@@ -78,5 +78,5 @@ async def handler(req, ctx=None):
     if isinstance(b.get("nextFeedingAt"), (int, float)):
         patch["nextFeedingAt"] = int(b["nextFeedingAt"])
 
-    updated = update(pet_id, patch)
+    updated = await services.store.update(pet_id, patch)
     return {"status": 200, "body": updated} if updated else {"status": 404, "body": {"message": "Not found"}}
@@ -0,0 +1,50 @@
+# src/services/bootstrap.py
+# Services the Python steps use, resolved once per worker process. Steps
+# import `services` at module level instead of touching sys.path and
+# re-importing the store inside every handler call:
+#
+#   try:
+#       from src.services.bootstrap import services
+#   except ImportError:  # not started from the project root
+#       services = None
+#
+# bootstrap_bench.py checks that sys.path and the per-call overhead of a step
+# stay flat over many calls.
+import importlib.util
+import os
+import sys
+from typing import FrozenSet
+try:
+    from . import pet_store_async, request_params
+    from .types import PET_FIELDS, PET_SPECIES, PET_STATUSES
+except ImportError:
+    sys.path.append(os.path.dirname(__file__))
+    import pet_store_async
+    import request_params
+    from types import PET_FIELDS, PET_SPECIES, PET_STATUSES
+
+STEPS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'python')
+
+class Services:
+    """Ready-to-use services for step handlers."""
+
+    def __init__(self):
+        # Awaitable pet store (see pet_store_async.py)
+        self.store = pet_store_async
+        # query_param, query_fields and etag_matches (see request_params.py)
+        self.request = request_params
+        # Field names accepted by ?fields=
+        self.pet_fields: FrozenSet[str] = PET_FIELDS
+        # Values accepted by the ?status= and ?species= list filters
+        self.pet_statuses: FrozenSet[str] = PET_STATUSES
+        self.pet_species: FrozenSet[str] = PET_SPECIES
+
+services = Services()
+
+def load_step(filename: str):
+    # Step files are not importable by name (e.g. deletion_reaper.cron_step.py)
+    path = os.path.join(STEPS_DIR, filename)
+    spec = importlib.util.spec_from_file_location(filename.replace('.', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
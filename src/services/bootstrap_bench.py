@@ -0,0 +1,50 @@
+# src/services/bootstrap_bench.py
+# `python -m src.services.bootstrap_bench [calls]` calls PyGetPet's handler
+# (default 10000 times) through bootstrap.services and checks that sys.path
+# and the per-call overhead of a step stay flat over many calls.
+import asyncio
+import sys
+import time
+from src.services.scratch import run_worker
+
+def _bench(calls: int) -> None:
+    # Compares the first and last thousand calls. Runs in a fresh worker whose
+    # cwd is a scratch directory (see scratch.py), so the first import below
+    # pays the whole startup cost: bootstrap, the store and its services.
+    start = time.perf_counter()
+    from src.services.bootstrap import load_step, services
+    import_ms = (time.perf_counter() - start) * 1000
+    from src.services import pet_store
+    start = time.perf_counter()
+    step = load_step('get_pet_step.py')
+    load_ms = (time.perf_counter() - start) * 1000
+    pid = pet_store.create('Bench', 'dog', 12)['id']
+    req = {'pathParams': {'id': pid}, 'queryParams': {}, 'headers': {}}
+    path_before = len(sys.path)
+
+    async def timed() -> list:
+        samples = []
+        for _ in range(calls):
+            t = time.perf_counter()
+            await step.handler(req)
+            samples.append(time.perf_counter() - t)
+        return samples
+
+    samples = asyncio.run(timed())
+    window = min(1000, calls // 2)
+    first = sum(samples[:window]) / window * 1e6
+    last = sum(samples[-window:]) / window * 1e6
+    print(f'services import: {import_ms:.1f} ms, step load: {load_ms:.1f} ms')
+    print(f'sys.path entries: {path_before} before, {len(sys.path)} after {calls} calls')
+    print(f'per call: {first:.1f} us over the first {window} calls, {last:.1f} us over the last {window}')
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['--worker']:
+        _bench(int(args[1]))
+        sys.exit(0)
+    calls = args[0] if args else '10000'
+    if not calls.isdigit() or int(calls) < 2:
+        print('usage: python -m src.services.bootstrap_bench [calls]  (calls >= 2)')
+        sys.exit(2)
+    run_worker('src.services.bootstrap_bench', [calls], check=True)
@@ -0,0 +1,144 @@
+# src/services/file_io.py
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Union
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, in-process locking still applies
+    fcntl = None
+
+def atomic_write(path: str, data: Union[str, bytes]) -> None:
+    # Readers see either the old or the new file, never a partial one
+    tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(tmp, 'wb' if isinstance(data, bytes) else 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    fsync_dir(os.path.dirname(path))
+
+def fsync_dir(path: str) -> None:
+    # Makes a rename in `path` durable; not supported on every platform
+    try:
+        dir_fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+def append_at(path: str, offset: int, data: bytes) -> int:
+    # Append `data` after the first `offset` bytes of `path` and fsync it.
+    # Anything past `offset` is a torn line from a crashed writer and is cut
+    # off first, so the caller must hold the file's lock: to a reader the same
+    # bytes may be an append still in progress. Returns the file's inode.
+    with open(path, 'ab') as f:
+        if f.tell() != offset:
+            f.truncate(offset)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+        return os.fstat(f.fileno()).st_ino
+
+class JsonLinesLog:
+    """Append-only file of one compact JSON value per line, folded incrementally.
+
+    Every complete line is passed to `fold` once, in order. When the file is
+    replaced or shrinks, `reset` clears the folded state and the log is folded
+    again from the start. A process that sees the file grow reads only the new
+    tail. Appends take `lock_path` so writers in several processes never
+    interleave, and truncate a torn line left by a crashed writer first.
+    """
+
+    def __init__(self, path: str, lock_path: str, fold: Callable[[Any], None], reset: Callable[[], None]):
+        self.path = path
+        self.lock_path = lock_path
+        self.fold = fold
+        self.reset = reset
+        self.mutex = threading.Lock()
+        # Bytes of the log folded so far, and the inode they came from
+        self.offset = 0
+        self.inode: Optional[int] = None
+
+    def _start_over(self, inode: Optional[int]) -> None:
+        self.reset()
+        self.offset = 0
+        self.inode = inode
+
+    def catch_up(self) -> None:
+        # Fold whatever was appended since the last call (by any process);
+        # caller holds self.mutex
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._start_over(None)
+            return
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self._start_over(st.st_ino)
+        if st.st_size == self.offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b'\n'):
+                break  # append in progress
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Torn append from a crashed writer; append() truncates it
+                break
+            self.offset += len(line)
+            self.fold(entry)
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        # self.mutex, with the log folded up to date
+        with self.mutex:
+            self.catch_up()
+            yield
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        # self.mutex plus the cross-process lock file, with the log folded up
+        # to date; append() and rewrite() are only called in here
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.mutex:
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                self.catch_up()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def append(self, entries: List[Any]) -> None:
+        # One write and fsync for the whole batch, then each entry is folded
+        data = _encode(entries)
+        self.inode = append_at(self.path, self.offset, data)
+        self.offset += len(data)
+        for entry in entries:
+            self.fold(entry)
+
+    def rewrite(self, entries: List[Any]) -> None:
+        # Replace the whole log with `entries`, which the folded state must
+        # already reflect (a compaction); nothing is folded
+        data = _encode(entries)
+        atomic_write(self.path, data)
+        self.offset, self.inode = len(data), os.stat(self.path).st_ino
+
+def _encode(entries: List[Any]) -> bytes:
+    return ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries).encode()
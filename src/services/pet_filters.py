@@ -0,0 +1,109 @@
+# src/services/pet_filters.py
+# Secondary indexes behind the status/species/age filters of list_all() and
+# list_page(). Pets are bucketed by status, by species, by (status, species)
+# and by ageMonths, and every bucket is kept sorted like list_all(), by
+# (-updatedAt, id). A filtered page bisects the best bucket (or the merged age
+# buckets of the range) to the cursor and walks forward until the page is
+# full, so it costs about the same as an unfiltered page.
+# pet_store owns the index and keeps it current.
+import bisect
+import heapq
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+try:
+    from .types import Pet, PetFilter
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from types import Pet, PetFilter
+
+# (status, species, ageMonths, updatedAt)
+Keys = Tuple[str, str, int, int]
+
+def _bucket_keys(keys: Keys) -> Tuple[tuple, ...]:
+    status, species, age, _ = keys
+    return ('status', status), ('species', species), ('pair', status, species), ('age', age)
+
+class FilterIndex:
+    """Sorted (-updatedAt, id) buckets per status, species, (status, species) and age."""
+
+    def __init__(self, rows: Iterable[Tuple[str, Keys]] = ()):
+        self.keys: Dict[str, Keys] = {}
+        self.buckets: Dict[tuple, List[Tuple[int, str]]] = {}
+        for pid, keys in rows:
+            self._add(pid, keys, sort=False)
+        for bucket in self.buckets.values():
+            bucket.sort()
+
+    def _add(self, pid: str, keys: Keys, sort: bool = True) -> None:
+        self.keys[pid] = keys
+        entry = (-keys[3], pid)
+        for key in _bucket_keys(keys):
+            bucket = self.buckets.setdefault(key, [])
+            if sort:
+                bisect.insort(bucket, entry)
+            else:
+                bucket.append(entry)
+
+    def set(self, pid: str, pet: Optional[Pet]) -> None:
+        # Re-index pet `pid`; None removes it
+        old = self.keys.pop(pid, None)
+        if old is not None:
+            entry = (-old[3], pid)
+            for key in _bucket_keys(old):
+                bucket = self.buckets[key]
+                i = bisect.bisect_left(bucket, entry)
+                if i < len(bucket) and bucket[i] == entry:
+                    del bucket[i]
+                if not bucket:
+                    del self.buckets[key]
+        if pet is not None:
+            self._add(pid, (pet['status'], pet['species'], pet['ageMonths'], pet['updatedAt']))
+
+    def _sources(self, filters: PetFilter) -> List[List[Tuple[int, str]]]:
+        # The buckets to walk: the one for status and/or species, or the age
+        # buckets of the range, whichever holds fewer pets
+        if 'status' in filters and 'species' in filters:
+            key = ('pair', filters['status'], filters['species'])
+        elif 'status' in filters:
+            key = ('status', filters['status'])
+        elif 'species' in filters:
+            key = ('species', filters['species'])
+        else:
+            key = None
+        primary = [self.buckets.get(key, [])] if key is not None else None
+        if 'minAgeMonths' not in filters and 'maxAgeMonths' not in filters:
+            return primary if primary is not None else [b for k, b in self.buckets.items() if k[0] == 'status']
+        lo, hi = filters.get('minAgeMonths', 0), filters.get('maxAgeMonths')
+        ages = [b for k, b in self.buckets.items() if k[0] == 'age' and lo <= k[1] and (hi is None or k[1] <= hi)]
+        if primary is not None and len(primary[0]) <= sum(len(b) for b in ages):
+            return primary
+        return ages
+
+    def select(self, filters: PetFilter, after: Optional[Tuple[int, str]] = None,
+               limit: Optional[int] = None) -> List[Tuple[int, str]]:
+        # (updatedAt, id) of the matching pets in list_all() order (newest
+        # first), starting past the `after` cursor key, at most `limit` of them
+        start = (-after[0], after[1]) if after is not None else None
+        walks = [_walk(bucket, start) for bucket in self._sources(filters)]
+        entries = walks[0] if len(walks) == 1 else heapq.merge(*walks)
+        matches = []
+        for neg_updated_at, pid in entries:
+            if limit is not None and len(matches) >= limit:
+                break
+            if _matches(self.keys[pid], filters):
+                matches.append((-neg_updated_at, pid))
+        return matches
+
+def _walk(bucket: List[Tuple[int, str]], start: Optional[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+    # Entries after `start`, without copying the bucket
+    i = bisect.bisect_right(bucket, start) if start is not None else 0
+    return (bucket[j] for j in range(i, len(bucket)))
+
+def _matches(keys: Keys, filters: PetFilter) -> bool:
+    status, species, age, _ = keys
+    return (
+        filters.get('status', status) == status
+        and filters.get('species', species) == species
+        and filters.get('minAgeMonths', age) <= age <= filters.get('maxAgeMonths', age)
+    )
@@ -0,0 +1,83 @@
+# src/services/pet_history.py
+# Append-only status history written by PyPetLifecycleOrchestrator. Each
+# transition is one compact JSON array in .data/status_history.log:
+#   [at, id, species, from, to, stayMs]
+# stayMs is how long the pet spent in `from` (null when unknown, e.g. the
+# pet's first recorded transition out of anything but 'new').
+#
+# Readers fold the log into per-pet histories and per species/status sorted
+# stay lists. The fold is incremental (file_io.JsonLinesLog): a process that
+# sees the file grow reads only the new tail, so queries never rescan the
+# history.
+import bisect
+import os
+from typing import Dict, List, Optional, Tuple
+try:
+    from .types import Pet
+    from .file_io import JsonLinesLog
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from types import Pet
+    from file_io import JsonLinesLog
+
+DATA_DIR = os.path.join(os.getcwd(), '.data')
+FILE = os.path.join(DATA_DIR, 'status_history.log')
+LOCK_FILE = os.path.join(DATA_DIR, 'status_history.lock')
+PERCENTILES = (50, 90, 99)
+
+# id -> [(at, from, to)], oldest first
+_by_pet: Dict[str, List[Tuple[int, str, str]]] = {}
+# (species, status) -> sorted stays in that status, in ms
+_stays: Dict[Tuple[str, str], List[int]] = {}
+
+def _reset() -> None:
+    global _by_pet, _stays
+    _by_pet = {}
+    _stays = {}
+
+def _fold(entry: list) -> None:
+    at, pid, species, from_status, to_status, stay_ms = entry
+    _by_pet.setdefault(pid, []).append((at, from_status, to_status))
+    if stay_ms is not None:
+        bisect.insort(_stays.setdefault((species, from_status), []), stay_ms)
+
+_log = JsonLinesLog(FILE, LOCK_FILE, _fold, _reset)
+
+def _stay(pid: str, from_status: str, pet: Pet, at: int) -> Optional[int]:
+    transitions = _by_pet.get(pid)
+    if transitions:
+        entered_at, _, status = transitions[-1]
+        return at - entered_at if status == from_status else None
+    if from_status == 'new' and 'createdAt' in pet:
+        return at - pet['createdAt']
+    return None
+
+def record(pet: Pet, to_status: str, at: int) -> None:
+    # `pet` as it was before the transition to `to_status` at `at` (ms)
+    with _log.writing():
+        _log.append([[at, pet['id'], pet['species'], pet['status'], to_status,
+                      _stay(pet['id'], pet['status'], pet, at)]])
+
+def history(pid: str) -> List[Dict]:
+    # Transitions of one pet, oldest first
+    with _log.reading():
+        return [{'at': at, 'from': f, 'to': t} for at, f, t in _by_pet.get(pid, [])]
+
+def percentile(values: List[int], p: int) -> int:
+    # Nearest-rank percentile of a sorted list; pet_timers uses it too
+    rank = max(1, -(-p * len(values) // 100))
+    return values[rank - 1]
+
+def time_in_status(species: Optional[str] = None) -> Dict[str, Dict[str, Dict]]:
+    # species -> status -> {count, p50Ms, p90Ms, p99Ms} over completed stays
+    with _log.reading():
+        result: Dict[str, Dict[str, Dict]] = {}
+        for (pet_species, status), stays in sorted(_stays.items()):
+            if species is not None and pet_species != species:
+                continue
+            summary = {'count': len(stays)}
+            for p in PERCENTILES:
+                summary[f'p{p}Ms'] = percentile(stays, p)
+            result.setdefault(pet_species, {})[status] = summary
+        return result
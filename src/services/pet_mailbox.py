@@ -0,0 +1,89 @@
+# src/services/pet_mailbox.py
+# Per-pet mailboxes for PyPetLifecycleOrchestrator. Every pet gets a FIFO of
+# pending events, drained by one task at a time, so a pet's events are applied
+# strictly in arrival order and never interleave. Different pets drain
+# concurrently, at most `limit` events at once across the worker; a pet's
+# mailbox and its task go away as soon as the mailbox is empty.
+#
+# Ordering holds within one worker process. Writes from other processes are
+# still serialized by the store's own transactions.
+import asyncio
+import os
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+# Events processed at once across all pets; further ones wait for a slot
+MAX_CONCURRENT_PETS = int(os.environ.get('PET_ORCHESTRATOR_CONCURRENCY', '16'))
+
+class PetMailboxes:
+    """Runs work for one pet at a time, for up to `limit` pets at once."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._boxes: Dict[str, Deque[tuple]] = {}
+        # The task draining each mailbox; the loop only keeps weak references
+        # to tasks, so without this one could be collected mid-drain
+        self._drains: Dict[str, asyncio.Task] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = 0
+
+    def _bind(self) -> asyncio.AbstractEventLoop:
+        # Mailboxes belong to the event loop that drains them
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._boxes = {}
+            self._drains = {}
+            self._slots = asyncio.Semaphore(self.limit)
+            self._running = 0
+        return loop
+
+    async def run(self, pid: str, fn: Callable[..., Awaitable], *args):
+        # Queue fn(*args) behind the pet's earlier work and wait for its result
+        loop = self._bind()
+        future = loop.create_future()
+        box = self._boxes.get(pid)
+        if box is None:
+            box = self._boxes[pid] = deque()
+            self._drains[pid] = loop.create_task(self._drain(pid, box))
+        box.append((fn, args, future))
+        return await future
+
+    async def _drain(self, pid: str, box: Deque[tuple]) -> None:
+        # The finally clauses keep a cancelled drain (e.g. at loop shutdown)
+        # from leaving callers waiting forever or a dead mailbox that would
+        # swallow the pet's later events
+        try:
+            while box:
+                fn, args, future = box.popleft()
+                try:
+                    async with self._slots:
+                        self._running += 1
+                        try:
+                            result = await fn(*args)
+                        finally:
+                            self._running -= 1
+                except Exception as error:
+                    if not future.done():
+                        future.set_exception(error)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    if not future.done():
+                        future.cancel()
+        finally:
+            while box:
+                box.popleft()[2].cancel()
+            if self._boxes.get(pid) is box:
+                del self._boxes[pid]
+                del self._drains[pid]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'pets': len(self._boxes),
+            'running': self._running,
+            'queued': sum(len(box) for box in self._boxes.values()),
+            'limit': self.limit,
+        }
@@ -0,0 +1,112 @@
+# src/services/pet_record.py
+# Compact in-memory form of a pet for the store's resident cache. A Pet dict
+# costs a hash table per pet plus a separate string for every status and
+# species value and a nested dict tree for the AI profile. A PetRecord is a
+# fixed __slots__ object with interned enum strings, the profile kept as one
+# compact JSON string, and pets are turned back into Pet dicts only when they
+# leave the store.
+import json
+import os
+import sys
+from collections.abc import MutableMapping
+from typing import Collection, Dict, Iterator, Optional, Tuple
+try:
+    from .types import Pet
+except ImportError:
+    sys.path.append(os.path.dirname(__file__))
+    from types import Pet
+
+FIELDS = (
+    'id', 'name', 'species', 'ageMonths', 'status', 'createdAt', 'updatedAt',
+    'notes', 'nextFeedingAt', 'deletedAt', 'purgeAt', 'version'
+)
+ENUM_FIELDS = ('species', 'status')
+
+class PetRecord:
+    # None means the field is absent; anything outside FIELDS (or a field
+    # that is present but null) is kept as-is in `extra`
+    __slots__ = FIELDS + ('profile', 'extra')
+
+    @classmethod
+    def from_pet(cls, pet: Pet) -> 'PetRecord':
+        record = cls.__new__(cls)
+        for field in FIELDS:
+            setattr(record, field, None)
+        record.profile = None
+        extra = None
+        for key, value in pet.items():
+            if value is None or (key not in FIELDS and key != 'profile'):
+                extra = extra or {}
+                extra[key] = value
+            elif key == 'profile':
+                record.profile = json.dumps(value, separators=(',', ':'))
+            elif key in ENUM_FIELDS and isinstance(value, str):
+                setattr(record, key, sys.intern(value))
+            else:
+                setattr(record, key, value)
+        record.extra = extra
+        return record
+
+    def to_pet(self, fields: Optional[Collection[str]] = None) -> Pet:
+        # Only `fields` when given; the profile is not decoded unless asked for
+        pet = {}
+        for field in FIELDS:
+            value = getattr(self, field)
+            if value is not None and (fields is None or field in fields):
+                pet[field] = value
+        if self.profile is not None and (fields is None or 'profile' in fields):
+            pet['profile'] = json.loads(self.profile)
+        if self.extra:
+            pet.update(self.extra if fields is None else {k: v for k, v in self.extra.items() if k in fields})
+        return pet
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, PetRecord) and self._values() == other._values()
+
+    __hash__ = None
+
+class PetRecords(MutableMapping):
+    """DbShape['pets'] holding PetRecords; reads hand out fresh Pet dicts."""
+
+    def __init__(self, records: Dict[str, PetRecord]):
+        self.records = records
+
+    @classmethod
+    def from_pets(cls, pets: Dict[str, Pet]) -> 'PetRecords':
+        return cls({pid: PetRecord.from_pet(pet) for pid, pet in pets.items()})
+
+    def __getitem__(self, pid: str) -> Pet:
+        return self.records[pid].to_pet()
+
+    def __setitem__(self, pid: str, pet: Pet) -> None:
+        self.records[pid] = PetRecord.from_pet(pet)
+
+    def __delitem__(self, pid: str) -> None:
+        del self.records[pid]
+
+    def __contains__(self, pid: object) -> bool:
+        return pid in self.records
+
+    def get(self, pid: str, default=None):
+        record = self.records.get(pid)
+        return record.to_pet() if record is not None else default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def version_of(self, pid: str) -> Optional[Tuple[int, int]]:
+        # (pet version, updatedAt) without building the dict; None if missing
+        record = self.records.get(pid)
+        return (record.version or 0, record.updatedAt) if record is not None else None
+
+    def index_rows(self) -> Iterator[Tuple[str, int, Optional[int]]]:
+        # (id, updatedAt, purgeAt of a soft-deleted pet or None) without building
+        # dicts; a soft-deleted pet without purgeAt is due at once (0)
+        for pid, record in self.records.items():
+            yield pid, record.updatedAt, (record.purgeAt or 0) if record.status == 'deleted' else None
@@ -0,0 +1,77 @@
+# src/services/pet_search.py
+# Inverted index over pet profiles for GET /py/pets/search. Each token of
+# profile.temperamentTags, profile.breedGuess and profile.bio maps to the pets
+# containing it, with a per-field weight so a temperament tag outranks a
+# passing mention in the bio. pet_store owns the index and keeps it current.
+import heapq
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+FIELD_WEIGHTS = (('temperamentTags', 3.0), ('breedGuess', 2.0), ('bio', 1.0))
+STOPWORDS = frozenset(
+    'a an and are as at be but by for from has have in is it its of on or so that the this to was were will with'.split()
+)
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+def tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+def _weights(profile: Dict) -> Dict[str, float]:
+    # token -> summed field weight of its occurrences
+    weights: Dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS:
+        value = profile.get(field)
+        if isinstance(value, list):
+            value = ' '.join(v for v in value if isinstance(v, str))
+        if not isinstance(value, str):
+            continue
+        for token in tokens(value):
+            weights[token] = weights.get(token, 0.0) + weight
+    return weights
+
+class ProfileIndex:
+    """token -> {pet id: weight}, plus each pet's tokens so it can be removed."""
+
+    def __init__(self, profiles: Iterable[Tuple[str, Dict]] = ()):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.docs: Dict[str, Set[str]] = {}
+        for pid, profile in profiles:
+            self.set(pid, profile)
+
+    def set(self, pid: str, profile: Optional[Dict]) -> None:
+        # Replace pet `pid`'s entry; a missing profile removes it
+        self.remove(pid)
+        if not isinstance(profile, dict):
+            return
+        weights = _weights(profile)
+        if not weights:
+            return
+        for token, weight in weights.items():
+            self.postings.setdefault(token, {})[pid] = weight
+        self.docs[pid] = set(weights)
+
+    def remove(self, pid: str) -> None:
+        for token in self.docs.pop(pid, ()):
+            posting = self.postings[token]
+            del posting[pid]
+            if not posting:
+                del self.postings[token]
+
+    def search(self, query: str, limit: int) -> List[Tuple[str, float]]:
+        # (id, score), best first. Pets matching more of the query terms rank
+        # first; within that, by summed weight x idf.
+        terms = list(dict.fromkeys(tokens(query)))
+        total = len(self.docs)
+        matched: Dict[str, int] = {}
+        scores: Dict[str, float] = {}
+        for term in terms:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + total / len(posting))
+            for pid, weight in posting.items():
+                matched[pid] = matched.get(pid, 0) + 1
+                scores[pid] = scores.get(pid, 0.0) + weight * idf
+        ranked = heapq.nsmallest(limit, scores, key=lambda pid: (-matched[pid], -scores[pid], pid))
+        return [(pid, round(scores[pid], 4)) for pid in ranked]
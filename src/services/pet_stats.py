@@ -0,0 +1,123 @@
+# src/services/pet_stats.py
+# Shelter counters behind GET /py/pets/stats: the number of pets and their
+# summed ageMonths per (status, species). pet_store adjusts them on every
+# write, one group down and one up, so reading the statistics never scans the
+# pets. Soft-deleted pets show up under byStatus.deleted only; total,
+# bySpecies and the average age cover the pets still in the shelter.
+#
+# The consistency check for a live store is pet_store.check_stats(), served by
+# GET /py/pets/stats?check=true. `python -m src.services.pet_stats [pets] [ops]`
+# is a self-test of the counter maintenance: it runs a random workload against
+# a throwaway scratch store, runs check_stats() after every batch of writes and
+# exits with status 1 if they ever drift. It never looks at the project's data.
+import os
+import random
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+try:
+    from .types import PET_SPECIES, PET_STATUSES, Pet, PetStats
+except ImportError:
+    sys.path.append(os.path.dirname(__file__))
+    from types import PET_SPECIES, PET_STATUSES, Pet, PetStats
+
+CHECK_EVERY = 50
+# Recounts check_stats() tries before reporting 'inconclusive'
+CHECK_ATTEMPTS = 3
+
+class ShelterStats:
+    """(status, species) -> [pets, summed ageMonths]."""
+
+    def __init__(self, groups: Iterable[Tuple[str, str, int, int]] = ()):
+        # Rows of (status, species, pets, summed ageMonths); a group may repeat
+        self.groups: Dict[Tuple[str, str], List[int]] = {}
+        for status, species, count, age_sum in groups:
+            self._add(status, species, count, age_sum)
+
+    def _add(self, status: str, species: str, count: int, age_sum: int) -> None:
+        group = self.groups.setdefault((status, species), [0, 0])
+        group[0] += count
+        group[1] += age_sum
+        if not group[0]:
+            del self.groups[(status, species)]
+
+    def update(self, old: Optional[Pet], new: Optional[Pet]) -> None:
+        # A pet went from `old` to `new`; None when it did not / no longer exists
+        if old is not None:
+            self._add(old['status'], old['species'], -1, -old['ageMonths'])
+        if new is not None:
+            self._add(new['status'], new['species'], 1, new['ageMonths'])
+
+    def summary(self) -> PetStats:
+        by_status = dict.fromkeys(sorted(PET_STATUSES), 0)
+        by_species = dict.fromkeys(sorted(PET_SPECIES), 0)
+        total = age_sum = 0
+        for (status, species), (count, ages) in self.groups.items():
+            by_status[status] = by_status.get(status, 0) + count
+            if status == 'deleted':
+                continue
+            by_species[species] = by_species.get(species, 0) + count
+            total += count
+            age_sum += ages
+        return {
+            'total': total,
+            'byStatus': by_status,
+            'bySpecies': by_species,
+            'averageAgeMonths': round(age_sum / total, 2) if total else None,
+        }
+
+def recount(pets: Iterable[Pet]) -> ShelterStats:
+    return ShelterStats((pet['status'], pet['species'], 1, pet['ageMonths']) for pet in pets)
+
+def drift(maintained: PetStats, recomputed: PetStats) -> List[Dict]:
+    # Every counter whose maintained value differs from the recount
+    def flat(stats: PetStats) -> Dict[str, object]:
+        values = {'total': stats['total'], 'averageAgeMonths': stats['averageAgeMonths']}
+        for group in ('byStatus', 'bySpecies'):
+            values.update({f'{group}.{key}': count for key, count in stats[group].items()})
+        return values
+    a, b = flat(maintained), flat(recomputed)
+    return [
+        {'counter': name, 'maintained': a.get(name, 0), 'recomputed': b.get(name, 0)}
+        for name in sorted(a.keys() | b.keys()) if a.get(name, 0) != b.get(name, 0)
+    ]
+
+def _workload(pets: int, ops: int) -> int:
+    # Runs in a worker whose cwd is a scratch directory (see scratch.py)
+    from src.services import pet_store
+    rng = random.Random(0)
+    species = sorted(PET_SPECIES)
+    statuses = sorted(PET_STATUSES - {'deleted'})
+    pet_store.create_many([
+        {'name': f'Pet {i}', 'species': rng.choice(species), 'ageMonths': rng.randint(0, 180)} for i in range(pets)
+    ])
+    pet_store.stats()  # build the counters, the writes below adjust them
+    ids = [pet['id'] for pet in pet_store.list_all(('id',))]
+    drifted = 0
+    for n in range(1, ops + 1):
+        op = rng.choice(('create', 'update', 'status', 'soft_delete', 'remove', 'update_many'))
+        if op == 'create':
+            ids.append(pet_store.create(f'Pet {n}', rng.choice(species), rng.randint(0, 180))['id'])
+        elif op == 'update':
+            pet_store.update(rng.choice(ids), {'species': rng.choice(species), 'ageMonths': rng.randint(0, 180)})
+        elif op == 'status':
+            pet_store.update_status(rng.choice(ids), rng.choice(statuses))
+        elif op == 'soft_delete':
+            pet_store.soft_delete(rng.choice(ids))
+        elif op == 'remove' and len(ids) > 1:
+            pet_store.remove(ids.pop(rng.randrange(len(ids))))
+        elif op == 'update_many':
+            pet_store.update_many({pid: {'ageMonths': rng.randint(0, 180)} for pid in rng.sample(ids, min(5, len(ids)))})
+        if n % CHECK_EVERY == 0 or n == ops:
+            for entry in pet_store.check_stats()['drift']:
+                drifted += 1
+                print(f"after {n} ops: {entry['counter']} is {entry['maintained']}, recount gives {entry['recomputed']}")
+    print(f'{pet_store.BACKEND}: {pets} pets, {ops} ops, {drifted} drifted counters')
+    print(pet_store.stats())
+    return 1 if drifted else 0
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['--worker']:
+        sys.exit(_workload(int(args[1]), int(args[2])))
+    from src.services.scratch import run_worker
+    sys.exit(run_worker('src.services.pet_stats', [args[0] if args else '1000', args[1] if len(args) > 1 else '500']).returncode)
@@ -1,46 +1,706 @@
 # src/services/pet_store.py
+import bisect
+import heapq
+import itertools
 import json
 import os
+import sys
+import threading
 import time
-from typing import Dict, Optional, List, TypedDict
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Collection, Dict, Iterator, Optional, List, TypedDict, Union
 try:
-    from .types import Pet
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, in-process locking still applies
+    fcntl = None
+try:
+    from .types import Pet, PetChangePage, PetFilter, PetPage, PetSearchHit, PetStats, PetStatsCheck
+    from .file_io import append_at, atomic_write
+    from .pet_record import PetRecords
+    from . import pet_filters, pet_search, pet_stats, pet_store_changes, pet_store_codec, pet_store_shards, pet_store_sqlite
 except ImportError:
     import sys
     sys.path.append(os.path.dirname(__file__))
-    from types import Pet
+    from types import Pet, PetChangePage, PetFilter, PetPage, PetSearchHit, PetStats, PetStatsCheck
+    from file_io import append_at, atomic_write
+    from pet_record import PetRecords
+    import pet_filters
+    import pet_search
+    import pet_stats
+    import pet_store_changes
+    import pet_store_codec
+    import pet_store_shards
+    import pet_store_sqlite
 
 DATA_DIR = os.path.join(os.getcwd(), '.data')
-FILE = os.path.join(DATA_DIR, 'pets.json')
+# Snapshot format of the json and log backends. 'json' is the pets.json shared
+# with the TypeScript and JavaScript stores; 'binary' is a memory-mapped
+# pets.bin that get() reads one record at a time (see pet_store_codec.py).
+CODEC = os.environ.get('PET_STORE_CODEC', 'json')
+JSON_FILE = os.path.join(DATA_DIR, 'pets.json')
+FILE = os.path.join(DATA_DIR, 'pets.bin') if CODEC == 'binary' else JSON_FILE
+LOG_FILE = os.path.join(DATA_DIR, 'pets.log')
+LOCK_FILE = os.path.join(DATA_DIR, 'pets.lock')
+
+# 'json' rewrites pets.json on every mutation. 'log' appends one delta record per
+# changed pet to pets.log and folds the log back into pets.json (the snapshot)
+# once it holds LOG_COMPACT_RECORDS records. 'sqlite' keeps pets in an indexed
+# SQLite database (see pet_store_sqlite.py). 'sharded' hash-partitions pets
+# across shard files that are locked and rewritten independently (see
+# pet_store_shards.py).
+BACKEND = os.environ.get('PET_STORE_BACKEND', 'json')
+LOG_COMPACT_RECORDS = int(os.environ.get('PET_STORE_LOG_COMPACT_RECORDS', '1000'))
+# How long the committing thread waits for other in-flight mutations to join
+# its write. Only applies when more than one thread is mutating.
+GROUP_COMMIT_MS = float(os.environ.get('PET_STORE_GROUP_COMMIT_MS', '2'))
+# Pets read per store call by iter_all()
+ITER_BATCH_SIZE = 500
+# Decoded pets kept for get(); 0 turns the hot-pet cache off
+HOT_CACHE_SIZE = int(os.environ.get('PET_STORE_HOT_CACHE_SIZE', '1024'))
+
+_log_records = 0
+# Bytes of pets.log up to its last complete record, as of the cached database;
+# the next append starts there
+_log_offset = 0
 
 class DbShape(TypedDict):
     seq: int
+    # Bumped by every write and stamped on the pets it changed. The sharded
+    # backend counts per shard instead (ShardedPets.versions).
+    version: int
     pets: Dict[str, Pet]
 
+# Parsed database shared by every call in this process. It is revalidated
+# against the on-disk files with os.stat and only re-parsed when another
+# process has written them.
+_cached_db: Optional[DbShape] = None
+_cached_stamp: Optional[Dict[str, Optional[tuple]]] = None
+_cache_hits = 0
+_cache_misses = 0
+
+# LRU of decoded pets, most recently read last, for the steps that get() the
+# same pet again and again along one event chain. Entries are dropped when the
+# store writes the pet or notices another process changed it, and the whole
+# cache when the database is re-read. _hot_gen counts invalidations: a get()
+# that raced one does not cache what it read.
+_hot: 'OrderedDict[str, tuple]' = OrderedDict()
+_hot_gen = 0
+_hot_bytes = 0
+_hot_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+# sqlite: per thread, the PRAGMA data_version last seen and the ids this
+# thread's open transaction wrote
+_hot_local = threading.local()
+
+# Secondary indexes over the cached database, rebuilt whenever it is re-parsed
+# and kept current by _write(). _purge_heap is a min-heap of (purgeAt, id) for
+# soft-deleted pets; entries go stale when a pet is purged or changes again and
+# are dropped lazily when they reach the top. _by_updated holds
+# (-updatedAt, id) in sorted order, i.e. the list_all() order.
+_purge_heap: List[tuple] = []
+_by_updated: List[tuple] = []
+# Profile search index (pet_search.py). Built by the first search() after a
+# reload rather than on every reload, then kept current like the others. With
+# sqlite it is tagged with the database version it reflects.
+_profile_index: Optional[pet_search.ProfileIndex] = None
+_profile_index_version: Optional[int] = None
+# Status/species/age index for filtered listings (pet_filters.py), also built
+# by the first query that needs it
+_filter_index: Optional[pet_filters.FilterIndex] = None
+# Shelter counters for stats() (pet_stats.py), built by the first call; tagged
+# with the database version like the profile index under sqlite
+_stats: Optional[pet_stats.ShelterStats] = None
+_stats_version: Optional[int] = None
+
+# Group commit. Mutations apply to the cached database under _mutex and join the
+# open batch (_open_gen); one thread then becomes the leader and makes the whole
+# batch durable with a single write, while the others wait on _committed. File
+# locks (_lock_fds) are held from the first change of a batch until it is on
+# disk, so other processes never load-modify-save on top of a stale file.
+_mutex = threading.RLock()
+_committed = threading.Condition(_mutex)
+_open_gen = 1
+_durable_gen = 0
+_dirty = False
+_pending_records: List[Dict] = []
+# Change feed entries of the open batch, appended once the batch is durable
+_pending_changes: List[tuple] = []
+_failed: Dict[int, Exception] = {}
+_leader = False
+_writers = 0
+_write_count = 0
+_lock_fds: Dict[str, int] = {}
+# Sharded: files whose lock was just taken. os.stat stamps can miss a rewrite
+# within the same mtime tick, so these are re-read unconditionally.
+_stale_locks: set = set()
+_commit_stats = {'changes': 0, 'writes': 0}
+
 def ensure_file() -> None:
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR, exist_ok=True)
     if not os.path.exists(FILE):
         init: DbShape = {'seq': 1, 'pets': {}}
-        with open(FILE, 'w') as f:
-            json.dump(init, f)
+        if CODEC == 'binary' and os.path.exists(JSON_FILE):
+            # First binary start on an existing install: import pets.json once,
+            # like the sqlite and sharded backends do
+            with open(JSON_FILE, 'r') as f:
+                init = json.load(f)
+        atomic_write(FILE, _encode(init))
+    if BACKEND == 'sharded':
+        pet_store_shards.ensure_layout()
+
+def _files() -> List[str]:
+    if BACKEND == 'log':
+        return [FILE, LOG_FILE]
+    if BACKEND == 'sharded':
+        return [pet_store_shards.META_FILE] + [pet_store_shards.shard_file(i) for i in range(_shard_count())]
+    return [FILE]
+
+def _shard_count() -> int:
+    if _cached_db is not None:
+        return len(_cached_db['pets'].shards)
+    return pet_store_shards.read_meta()['shards']
+
+def _stat(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def _stamp() -> Dict[str, Optional[tuple]]:
+    return {path: _stat(path) for path in _files()}
+
+def _remember(db: Optional[DbShape]) -> None:
+    global _cached_db, _cached_stamp
+    if db is not _cached_db:
+        _drop_hot()
+    if db is not None and db is not _cached_db:
+        _rebuild_indexes(db)
+    _cached_db = db
+    _cached_stamp = _stamp() if db is not None else None
+
+def cache_stats() -> Dict[str, int]:
+    return {'hits': _cache_hits, 'misses': _cache_misses}
+
+def commit_stats() -> Dict[str, int]:
+    # changes: pet records made durable, writes: durable file writes (fsyncs) it took
+    return dict(_commit_stats)
+
+def hot_cache_stats() -> Dict[str, Union[int, float]]:
+    # bytes is an estimate from sys.getsizeof over the cached dicts
+    with _mutex:
+        lookups = _hot_stats['hits'] + _hot_stats['misses']
+        return {
+            **_hot_stats,
+            'hitRatio': _hot_stats['hits'] / lookups if lookups else 0.0,
+            'size': len(_hot),
+            'capacity': HOT_CACHE_SIZE,
+            'bytes': _hot_bytes,
+        }
+
+def _sizeof(value) -> int:
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+def _clone(value):
+    # Callers may mutate what get() returns; cached pets must not change with it
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone(v) for v in value]
+    return value
+
+def _drop_hot(pids: Optional[Collection[str]] = None) -> None:
+    # Invalidate `pids`, or every cached pet when None
+    global _hot_gen, _hot_bytes
+    with _mutex:
+        _hot_gen += 1
+        if pids is None:
+            _hot.clear()
+            _hot_bytes = 0
+            return
+        for pid in pids:
+            entry = _hot.pop(pid, None)
+            if entry is not None:
+                _hot_bytes -= entry[1]
+
+def _hot_get(pid: str) -> Optional[Pet]:
+    entry = _hot.get(pid)
+    if entry is None:
+        _hot_stats['misses'] += 1
+        return None
+    _hot.move_to_end(pid)
+    _hot_stats['hits'] += 1
+    return entry[0]
+
+def _hot_put(pid: str, pet: Pet) -> None:
+    global _hot_bytes
+    size = _sizeof(pet)
+    _hot[pid] = (pet, size)
+    _hot_bytes += size
+    while len(_hot) > HOT_CACHE_SIZE:
+        _, (_, evicted) = _hot.popitem(last=False)
+        _hot_bytes -= evicted
+        _hot_stats['evictions'] += 1
+
+def _check_sqlite_version() -> None:
+    # data_version moves when another connection commits, so pets read before
+    # that may be stale. This thread's own commits invalidate their ids.
+    version = pet_store_sqlite.data_version()
+    if getattr(_hot_local, 'data_version', version) != version:
+        _drop_hot()
+    _hot_local.data_version = version
 
 def load() -> DbShape:
-    ensure_file()
+    global _cached_db, _cached_stamp, _cache_hits, _cache_misses
+    if BACKEND == 'sqlite':
+        # Rows are read on demand through a view, nothing to cache here
+        return pet_store_sqlite.load()
+    with _mutex:
+        if _cached_db is not None:
+            if BACKEND == 'sharded':
+                fresh = _refresh_shards()
+            else:
+                # Changes waiting for their batch write only exist in memory
+                fresh = _dirty or _stamp() == _cached_stamp
+            if fresh:
+                _cache_hits += 1
+                return _cached_db
+        _cache_misses += 1
+        ensure_file()
+        while True:
+            # Stat around the read and retry if a writer replaced the files meanwhile
+            stamp = _stamp()
+            db = _read_files()
+            if _stamp() == stamp:
+                break
+        _rebuild_indexes(db)
+        _drop_hot()
+        _cached_db, _cached_stamp = db, stamp
+        _stale_locks.clear()
+        return db
+
+def _read_files() -> DbShape:
+    if BACKEND == 'sharded':
+        meta = pet_store_shards.read_meta()
+        shards, versions = [], []
+        for i in range(meta['shards']):
+            pets, version = pet_store_shards.read_shard(i)
+            shards.append(PetRecords.from_pets(pets))
+            versions.append(version)
+        return {'seq': meta['seq'], 'pets': pet_store_shards.ShardedPets(shards, versions)}
+    db = _decode()
+    if BACKEND == 'log':
+        _replay_log(db)
+    return db
+
+def _encode(db: DbShape) -> Union[str, bytes]:
+    if CODEC == 'binary':
+        return pet_store_codec.dump(db)
+    return json.dumps({'seq': db['seq'], 'version': db.get('version', 0), 'pets': dict(db['pets'].items())})
+
+def _decode() -> DbShape:
+    # The mapped binary snapshot is already compact; JSON is parsed into PetRecords
+    if CODEC == 'binary':
+        return pet_store_codec.load(FILE)
     with open(FILE, 'r') as f:
-        return json.load(f)
+        db = json.load(f)
+    db['pets'] = PetRecords.from_pets(db['pets'])
+    return db
+
+def _refresh_shards() -> bool:
+    # Re-read only the shards another process has rewritten, updating the
+    # indexes pet by pet. False when the whole layout has to be reloaded.
+    meta_file = pet_store_shards.META_FILE
+    stamp = _stat(meta_file)
+    if stamp != _cached_stamp.get(meta_file) or 'meta' in _stale_locks:
+        meta = pet_store_shards.read_meta()
+        if meta['shards'] != len(_cached_db['pets'].shards):
+            return False
+        _cached_db['seq'] = max(_cached_db['seq'], meta['seq'])
+        _cached_stamp[meta_file] = stamp
+    shards = _cached_db['pets'].shards
+    for i in range(len(shards)):
+        path = pet_store_shards.shard_file(i)
+        stamp = _stat(path)
+        if stamp == _cached_stamp.get(path) and pet_store_shards.lock_name(i) not in _stale_locks:
+            continue
+        pets, version = pet_store_shards.read_shard(i)
+        old, new = shards[i], PetRecords.from_pets(pets)
+        changed = [pid for pid in old.records.keys() | new.records.keys() if old.records.get(pid) != new.records.get(pid)]
+        for pid in changed:
+            _reindex(pid, old.get(pid), new.get(pid))
+        _drop_hot(changed)
+        shards[i] = new
+        _cached_db['pets'].versions[i] = version
+        _cached_stamp[path] = stamp
+    _stale_locks.clear()
+    return True
+
+def _index_rows(pets: Dict[str, Pet]) -> Iterator[tuple]:
+    # (id, updatedAt, purgeAt of a soft-deleted pet or None)
+    if isinstance(pets, pet_store_shards.ShardedPets):
+        return itertools.chain.from_iterable(_index_rows(shard) for shard in pets.shards)
+    if isinstance(pets, (PetRecords, pet_store_codec.MappedPets)):
+        return pets.index_rows()
+    return (
+        (pid, pet['updatedAt'], _purge_at(pet) if pet['status'] == 'deleted' else None)
+        for pid, pet in pets.items()
+    )
+
+def _purge_at(pet: Pet) -> int:
+    # A soft-deleted pet without purgeAt is due at once, as it always was
+    return pet.get('purgeAt') or 0
+
+def _rebuild_indexes(db: DbShape) -> None:
+    global _purge_heap, _by_updated, _profile_index, _filter_index, _stats
+    _profile_index = None
+    _filter_index = None
+    _stats = None
+    rows = list(_index_rows(db['pets']))
+    _purge_heap = [(purge_at, pid) for pid, _, purge_at in rows if purge_at is not None]
+    heapq.heapify(_purge_heap)
+    _by_updated = sorted((-updated_at, pid) for pid, updated_at, _ in rows)
+
+def _reindex(pid: str, old: Optional[Pet], new: Optional[Pet]) -> None:
+    if new and new['status'] == 'deleted':
+        if not old or old['status'] != 'deleted' or _purge_at(old) != _purge_at(new):
+            heapq.heappush(_purge_heap, (_purge_at(new), pid))
+    if old and (not new or old['updatedAt'] != new['updatedAt']):
+        i = bisect.bisect_left(_by_updated, (-old['updatedAt'], pid))
+        if i < len(_by_updated) and _by_updated[i] == (-old['updatedAt'], pid):
+            del _by_updated[i]
+    if new and (not old or old['updatedAt'] != new['updatedAt']):
+        bisect.insort(_by_updated, (-new['updatedAt'], pid))
+    if _profile_index is not None and (old or {}).get('profile') != (new or {}).get('profile'):
+        _profile_index.set(pid, (new or {}).get('profile'))
+    if _filter_index is not None:
+        _filter_index.set(pid, new)
+    if _stats is not None:
+        _stats.update(old, new)
+
+def _filter_rows(pets: Dict[str, Pet]) -> Iterator[tuple]:
+    # (id, (status, species, ageMonths, updatedAt)) of every pet
+    if isinstance(pets, pet_store_shards.ShardedPets):
+        return itertools.chain.from_iterable(_filter_rows(shard) for shard in pets.shards)
+    if isinstance(pets, PetRecords):
+        return ((pid, (r.status, r.species, r.ageMonths, r.updatedAt)) for pid, r in pets.records.items())
+    return ((pid, (pet['status'], pet['species'], pet['ageMonths'], pet['updatedAt'])) for pid, pet in pets.items())
+
+def _filtered(db: DbShape, filters: PetFilter, after: Optional[tuple] = None,
+              limit: Optional[int] = None) -> List[tuple]:
+    # (updatedAt, id) of the pets matching `filters`, in list_all() order
+    global _filter_index
+    if _filter_index is None:
+        _filter_index = pet_filters.FilterIndex(_filter_rows(db['pets']))
+    return _filter_index.select(filters, after, limit)
+
+def _profile_rows(pets: Dict[str, Pet]) -> Iterator[tuple]:
+    # (id, profile) of every pet with a profile
+    if isinstance(pets, pet_store_shards.ShardedPets):
+        return itertools.chain.from_iterable(_profile_rows(shard) for shard in pets.shards)
+    if isinstance(pets, PetRecords):
+        return ((pid, json.loads(r.profile)) for pid, r in pets.records.items() if r.profile is not None)
+    return ((pid, pet['profile']) for pid, pet in pets.items() if pet.get('profile') is not None)
 
 def save(db: DbShape) -> None:
-    with open(FILE, 'w') as f:
-        json.dump(db, f)
+    global _log_records, _log_offset
+    with _mutex:
+        if BACKEND == 'sharded':
+            _save_shards(db, range(len(db['pets'].shards)))
+        else:
+            atomic_write(FILE, _encode(db))
+            if CODEC == 'binary':
+                # Map the new file so the old one can be released
+                db['pets'] = pet_store_codec.load(FILE)['pets']
+        if BACKEND == 'log' and os.path.exists(LOG_FILE):
+            # The snapshot now contains every logged delta
+            with open(LOG_FILE, 'w'):
+                pass
+            _log_records = 0
+            _log_offset = 0
+        _remember(db)
+
+def _save_shards(db: DbShape, indexes, meta: bool = True) -> int:
+    shards, versions = db['pets'].shards, db['pets'].versions
+    if meta:
+        atomic_write(pet_store_shards.META_FILE, pet_store_shards.dump_meta(len(shards), db['seq']))
+    for i in indexes:
+        atomic_write(pet_store_shards.shard_file(i), pet_store_shards.dump_shard(dict(shards[i].items()), versions[i]))
+    return len(indexes) + (1 if meta else 0)
+
+def compact() -> None:
+    with _mutex:
+        _flush()
+        _lock_store(_lock_names(()))
+        try:
+            save(load())
+        finally:
+            _unlock_store()
+
+def _replay_log(db: DbShape) -> None:
+    # Readers do not hold pets.lock, so an incomplete last line may be an
+    # append still in progress: stop there and leave the file alone.
+    # _append_log() cuts off a tail that really was torn by a crashed writer.
+    global _log_records, _log_offset
+    _log_records = 0
+    _log_offset = 0
+    if not os.path.exists(LOG_FILE):
+        return
+    with open(LOG_FILE, 'rb') as f:
+        data = f.read()
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b'\n'):
+            break
+        try:
+            record = json.loads(line)
+        except ValueError:
+            break
+        _log_offset += len(line)
+        _apply_record(db, record)
+        _log_records += 1
+
+def _apply_record(db: DbShape, record: Dict) -> None:
+    db['seq'] = max(db['seq'], record['seq'])
+    db['version'] = max(db.get('version', 0), record.get('version', 0))
+    if record.get('del'):
+        db['pets'].pop(record['id'], None)
+    else:
+        db['pets'][record['id']] = {**db['pets'].get(record['id'], {}), **record['set']}
+
+def _append_log(records: List[Dict]) -> None:
+    # Caller holds pets.lock and a cached database that matches the files, so
+    # anything past _log_offset is a torn tail and append_at() drops it
+    global _log_offset
+    data = ''.join(json.dumps(r) + '\n' for r in records).encode()
+    append_at(LOG_FILE, _log_offset, data)
+    _log_offset += len(data)
+
+def _lock_names(pids) -> List[str]:
+    # pets.lock guards the single-file backends. Sharded: one lock per shard,
+    # plus 'meta' for mutations that allocate ids (no pids known up front).
+    if BACKEND != 'sharded':
+        return ['pets']
+    if not pids:
+        return ['meta']
+    count = _shard_count()
+    return sorted({pet_store_shards.lock_name(pet_store_shards.shard_of(pid, count)) for pid in pids})
+
+def _lock_path(name: str) -> str:
+    return LOCK_FILE if name == 'pets' else pet_store_shards.lock_file(name)
+
+def _lock_store(names: List[str]) -> bool:
+    # Returns True when a lock was newly taken, i.e. its files must be revalidated
+    if fcntl is None:
+        return False
+    needed = sorted(set(names) - _lock_fds.keys())
+    if not needed:
+        return False
+    ensure_file()
+    for name in needed:
+        fd = os.open(_lock_path(name), os.O_RDWR | os.O_CREAT, 0o644)
+        if _lock_fds and max(_lock_fds) > name:
+            # Out of order while holding other locks: blocking here could deadlock
+            # with another process, so write out the open batch and start over
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                _flush()
+                _unlock_store()
+                return _lock_store(names)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        _lock_fds[name] = fd
+        _stale_locks.add(name)
+    return True
+
+def _unlock_store() -> None:
+    for fd in _lock_fds.values():
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+    _lock_fds.clear()
+
+@contextmanager
+def _transaction(*pids: str) -> Iterator[DbShape]:
+    # Load-modify-write for one mutation of `pids` (none: it creates pets).
+    # Returns once its changes are durable.
+    global _writers
+    if BACKEND == 'sqlite':
+        outer = not hasattr(_hot_local, 'written')
+        if outer:
+            _hot_local.written = set()
+        try:
+            with pet_store_sqlite.transaction():
+                yield pet_store_sqlite.load()
+        finally:
+            if outer:
+                # Again after COMMIT: a get() on another thread may have
+                # cached the old row while the transaction was open
+                _drop_hot(_hot_local.written)
+                del _hot_local.written
+        return
+    with _mutex:
+        _writers += 1
+    try:
+        with _mutex:
+            _lock_store(_lock_names(pids))
+            writes_before = _write_count
+            try:
+                yield load()
+            finally:
+                gen = _open_gen if _write_count != writes_before else None
+                if not _dirty and not _leader:
+                    _unlock_store()
+        if gen is not None:
+            _wait_durable(gen)
+    finally:
+        with _mutex:
+            _writers -= 1
+
+def _wait_durable(gen: int) -> None:
+    global _leader
+    while True:
+        with _mutex:
+            while _durable_gen < gen and _leader:
+                _committed.wait()
+            if _durable_gen >= gen:
+                if gen in _failed:
+                    raise _failed[gen]
+                return
+            _leader = True
+        try:
+            if GROUP_COMMIT_MS > 0 and _writers > 1:
+                time.sleep(GROUP_COMMIT_MS / 1000)
+            _flush()
+        finally:
+            with _mutex:
+                _leader = False
+                _committed.notify_all()
+
+def _flush() -> None:
+    # Write the open batch with a single durable write (one per dirty shard)
+    global _open_gen, _durable_gen, _dirty, _pending_records, _pending_changes, _log_records
+    with _mutex:
+        if not _dirty:
+            return
+        gen, records, changes, db = _open_gen, _pending_records, _pending_changes, _cached_db
+        _open_gen += 1
+        _dirty = False
+        _pending_records = []
+        _pending_changes = []
+        try:
+            if BACKEND == 'sharded':
+                count = len(db['pets'].shards)
+                dirty_shards = sorted({pet_store_shards.shard_of(r['id'], count) for r in records})
+                writes = _save_shards(db, dirty_shards, meta='meta' in _lock_fds)
+                _remember(db)
+            elif BACKEND == 'log' and _log_records + len(records) < LOG_COMPACT_RECORDS:
+                _append_log(records)
+                _log_records += len(records)
+                writes = 1
+                _remember(db)
+            else:
+                save(db)
+                writes = 1
+            # Still under the store locks, so feed order matches commit order
+            # for each pet. A crash right here loses this batch's feed entries.
+            pet_store_changes.append(changes)
+            _commit_stats['changes'] += len(records)
+            _commit_stats['writes'] += writes
+        except Exception as error:
+            # The cached database now disagrees with disk: fail the batch and re-read
+            _failed[gen] = error
+            for old_gen in [g for g in _failed if g < gen - 64]:
+                del _failed[old_gen]
+            _remember(None)
+        finally:
+            _durable_gen = gen
+            _unlock_store()
+            _committed.notify_all()
+
+def _write(db: DbShape, changes: Dict[str, Optional[Pet]]) -> None:
+    # Single persistence point for every mutation; a None value removes the pet.
+    # Must run inside _transaction(), which waits for the batch write.
+    global _dirty, _write_count, _profile_index, _profile_index_version, _stats, _stats_version
+    if BACKEND == 'sqlite':
+        previous = db['version']
+        _stamp_versions(db, changes)
+        olds = {pid: db['pets'].get(pid) for pid in changes}
+        feed = [_change(pid, olds[pid], pet) for pid, pet in changes.items()]
+        with _mutex:
+            # Incremental only if the index reflects the version this write builds on
+            if _profile_index is not None and _profile_index_version == previous:
+                for pid, pet in changes.items():
+                    if (olds[pid] or {}).get('profile') != (pet or {}).get('profile'):
+                        _profile_index.set(pid, (pet or {}).get('profile'))
+                _profile_index_version = db['version']
+            else:
+                _profile_index = None
+            if _stats is not None and _stats_version == previous:
+                for pid, pet in changes.items():
+                    _stats.update(olds[pid], pet)
+                _stats_version = db['version']
+            else:
+                _stats = None
+        _drop_hot(changes)
+        _hot_local.written.update(changes)
+        pet_store_sqlite.write(db, changes, feed)
+        return
+    if _lock_store(_lock_names(changes.keys())):
+        # New pets can land in shards this transaction had not locked yet
+        db = load()
+    _stamp_versions(db, changes)
+    _drop_hot(changes)
+    version = db.get('version', 0)
+    for pid, pet in changes.items():
+        old = db['pets'].get(pid)
+        _reindex(pid, old, pet)
+        _pending_changes.append(_change(pid, old, pet))
+        if pet is None:
+            db['pets'].pop(pid, None)
+            _pending_records.append({'seq': db['seq'], 'version': version, 'id': pid, 'del': True})
+        else:
+            db['pets'][pid] = pet
+            delta = {k: v for k, v in pet.items() if old is None or k not in old or old[k] != v}
+            _pending_records.append({'seq': db['seq'], 'version': version, 'id': pid, 'set': delta})
+    _dirty = True
+    _write_count += 1
+
+def _change(pid: str, old: Optional[Pet], new: Optional[Pet]) -> tuple:
+    # Change feed entry (op, id, changed fields); the version stamp is left out
+    if new is None:
+        return ('delete', pid, [])
+    if old is None:
+        return ('create', pid, sorted(k for k in new if k != 'version'))
+    return ('update', pid, sorted(k for k in old.keys() | new.keys() if k != 'version' and old.get(k) != new.get(k)))
+
+def _stamp_versions(db: DbShape, changes: Dict[str, Optional[Pet]]) -> None:
+    pets = db['pets']
+    if isinstance(pets, pet_store_shards.ShardedPets):
+        bumped: Dict[int, int] = {}
+        for pid, pet in changes.items():
+            i = pet_store_shards.shard_of(pid, len(pets.shards))
+            if i not in bumped:
+                pets.versions[i] += 1
+                bumped[i] = pets.versions[i]
+            if pet is not None:
+                pet['version'] = bumped[i]
+        return
+    db['version'] = db.get('version', 0) + 1
+    for pet in changes.values():
+        if pet is not None:
+            pet['version'] = db['version']
 
 def _now() -> int:
     return int(time.time() * 1000)
 
-def create(name: str, species: str, ageMonths: int) -> Pet:
-    db = load()
-    pid = str(db['seq'])
-    db['seq'] += 1
+def _new_pet(pid: str, name: str, species: str, ageMonths: int,
+             weight_kg: Optional[float] = None, symptoms: Optional[List[str]] = None) -> Pet:
     pet: Pet = {
         'id': pid,
         'name': name.strip(),
@@ -50,95 +710,362 @@ def create(name: str, species: str, ageMonths: int) -> Pet:
         'createdAt': _now(),
         'updatedAt': _now()
     }
-    db['pets'][pid] = pet
-    save(db)
+    if weight_kg is not None:
+        pet['weightKg'] = weight_kg
+    if symptoms is not None:
+        pet['symptoms'] = symptoms
     return pet
 
-def update_status(pid: str, status: str) -> Optional[Pet]:
-    db = load()
-    pet = db['pets'].get(pid)
-    if not pet:
-        return None
-    
-    updated_pet: Pet = {
-        **pet,
-        'status': status,
+def _patched(cur: Pet, patch: Dict) -> Pet:
+    return {
+        **cur,
+        **patch,
+        'name': patch['name'].strip() if isinstance(patch.get('name'), str) else cur['name'],
+        'ageMonths': max(0, int(patch['ageMonths'])) if isinstance(patch.get('ageMonths'), (int, float)) else cur['ageMonths'],
         'updatedAt': _now()
     }
-    db['pets'][pid] = updated_pet
-    save(db)
+
+def create(name: str, species: str, ageMonths: int,
+           weight_kg: Optional[float] = None, symptoms: Optional[List[str]] = None) -> Pet:
+    with _transaction() as db:
+        pid = str(db['seq'])
+        db['seq'] += 1
+        pet = _new_pet(pid, name, species, ageMonths, weight_kg, symptoms)
+        _write(db, {pid: pet})
+    return pet
+
+def create_many(items: List[Dict]) -> List[Pet]:
+    # items hold name/species/ageMonths (+ optional weightKg/symptoms); all pets are written in one batch
+    with _transaction() as db:
+        created: List[Pet] = []
+        for item in items:
+            pid = str(db['seq'])
+            db['seq'] += 1
+            created.append(_new_pet(
+                pid, item['name'], item['species'], item['ageMonths'],
+                item.get('weightKg'), item.get('symptoms')
+            ))
+        if created:
+            _write(db, {pet['id']: pet for pet in created})
+    return created
+
+def update_status(pid: str, status: str) -> Optional[Pet]:
+    with _transaction(pid) as db:
+        pet = db['pets'].get(pid)
+        if not pet:
+            return None
+
+        updated_pet: Pet = {
+            **pet,
+            'status': status,
+            'updatedAt': _now()
+        }
+        _write(db, {pid: updated_pet})
     return updated_pet
 
-def list_all() -> List[Pet]:
-    db = load()
-    return sorted(db['pets'].values(), key=lambda p: p['updatedAt'], reverse=True)
+def _project(pet: Optional[Pet], fields: Optional[Collection[str]]) -> Optional[Pet]:
+    if pet is None or fields is None:
+        return pet
+    return {k: v for k, v in pet.items() if k in fields}
+
+def _view(pets: Dict[str, Pet], pid: str, fields: Optional[Collection[str]] = None) -> Optional[Pet]:
+    # Pet `pid` limited to `fields` (all fields when None). Compact records
+    # build only the requested fields instead of projecting a full copy.
+    if isinstance(pets, pet_store_shards.ShardedPets):
+        pets = pets.shard(pid)
+    if isinstance(pets, PetRecords):
+        record = pets.records.get(pid)
+        return record.to_pet(fields) if record is not None else None
+    return _project(pets.get(pid), fields)
+
+def list_all(fields: Optional[Collection[str]] = None, filters: Optional[PetFilter] = None) -> List[Pet]:
+    if BACKEND == 'sqlite':
+        return [_project(pet, fields) for pet in pet_store_sqlite.list_all(filters)]
+    with _mutex:
+        db = load()
+        if filters:
+            return [_view(db['pets'], pid, fields) for _, pid in _filtered(db, filters)]
+        return [_view(db['pets'], pid, fields) for _, pid in _by_updated]
+
+def encode_cursor(pet: Pet) -> str:
+    return f"{pet['updatedAt']}:{pet['id']}"
+
+def decode_cursor(cursor: str) -> tuple:
+    updated_at, _, pid = cursor.partition(':')
+    if not pid:
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return int(updated_at), pid
+
+def list_page(limit: int, cursor: Optional[str] = None, fields: Optional[Collection[str]] = None,
+              filters: Optional[PetFilter] = None) -> PetPage:
+    # Pages follow list_all() order; the cursor is the last pet of the previous page
+    if BACKEND == 'sqlite':
+        pets = pet_store_sqlite.list_page(limit, decode_cursor(cursor) if cursor else None, filters)
+        keys = [{'updatedAt': pet['updatedAt'], 'id': pet['id']} for pet in pets]
+        items = [_project(pet, fields) for pet in pets]
+    else:
+        start = 0
+        if cursor:
+            updated_at, pid = decode_cursor(cursor)
+        with _mutex:
+            db = load()
+            if filters:
+                matches = _filtered(db, filters, (updated_at, pid) if cursor else None, limit + 1)
+                entries = [(-match_updated_at, match_pid) for match_updated_at, match_pid in matches]
+            else:
+                if cursor:
+                    start = bisect.bisect_right(_by_updated, (-updated_at, pid))
+                entries = _by_updated[start:start + limit + 1]
+            keys = [{'updatedAt': -neg_updated_at, 'id': pid} for neg_updated_at, pid in entries]
+            items = [_view(db['pets'], pid, fields) for _, pid in entries]
+    has_more = len(items) > limit
+    return {'items': items[:limit], 'nextCursor': encode_cursor(keys[limit - 1]) if has_more else None}
+
+def list_ids(filters: Optional[PetFilter] = None) -> List[str]:
+    # Ids of list_all(), in its order
+    if BACKEND == 'sqlite':
+        return pet_store_sqlite.list_ids(filters)
+    with _mutex:
+        db = load()
+        return [pid for _, pid in (_filtered(db, filters) if filters else _by_updated)]
+
+def get_many(pids: List[str], fields: Optional[Collection[str]] = None) -> List[Pet]:
+    # The pets of `pids` that still exist, in that order
+    if BACKEND == 'sqlite':
+        return [_project(pet, fields) for pet in pet_store_sqlite.get_many(pids)]
+    with _mutex:
+        db = load()
+        pets = (_view(db['pets'], pid, fields) for pid in pids)
+        return [pet for pet in pets if pet is not None]
+
+def iter_all(fields: Optional[Collection[str]] = None, batch_size: int = ITER_BATCH_SIZE,
+             filters: Optional[PetFilter] = None) -> Iterator[Pet]:
+    # list_all() order as of the call. The ids are snapshotted up front and the
+    # pets read batch by batch, so a pet updated mid-iteration is still
+    # yielded exactly once (with its newer data); pets removed meanwhile are
+    # skipped and pets created meanwhile are not included.
+    pids = list_ids(filters)
+    for start in range(0, len(pids), batch_size):
+        yield from get_many(pids[start:start + batch_size], fields)
+
+def get(pid: str, fields: Optional[Collection[str]] = None) -> Optional[Pet]:
+    if HOT_CACHE_SIZE <= 0:
+        db = load()
+        return _view(db['pets'], pid, fields)
+    if BACKEND == 'sqlite':
+        with _mutex:
+            _check_sqlite_version()
+            pet, gen = _hot_get(pid), _hot_gen
+        if pet is None:
+            pet = load()['pets'].get(pid)
+            with _mutex:
+                if pet is not None and gen == _hot_gen:
+                    _hot_put(pid, pet)
+    else:
+        # Under _mutex, so no write can land between the read and the put
+        with _mutex:
+            db = load()
+            pet = _hot_get(pid)
+            if pet is None and fields is not None and 'profile' not in fields:
+                # Without the profile a compact record is built without
+                # decoding it, cheaper than the full pet the cache holds
+                return _view(db['pets'], pid, fields)
+            if pet is None:
+                pet = _view(db['pets'], pid)
+                if pet is not None:
+                    _hot_put(pid, pet)
+    return _clone(_project(pet, fields)) if pet is not None else None
+
+def version_tag() -> str:
+    # Changes whenever any pet changes. The version counter alone would miss
+    # writes by the TypeScript/JavaScript stores, which keep it as-is, so seq,
+    # the pet count and the newest updatedAt are part of the tag too.
+    if BACKEND == 'sqlite':
+        stamp = pet_store_sqlite.version_stamp()
+    else:
+        with _mutex:
+            db = load()
+            pets = db['pets']
+            if isinstance(pets, pet_store_shards.ShardedPets):
+                version = sum(pets.versions)
+            else:
+                version = db.get('version', 0)
+            stamp = (version, db['seq'], len(pets), -_by_updated[0][0] if _by_updated else 0)
+    return '-'.join(str(part) for part in stamp)
+
+def pet_version_tag(pid: str) -> Optional[str]:
+    # Changes whenever pet `pid` changes; None if it does not exist
+    pets = load()['pets']
+    if isinstance(pets, pet_store_shards.ShardedPets):
+        pets = pets.shard(pid)
+    stamp = pets.version_of(pid)
+    return f'{stamp[0]}-{stamp[1]}' if stamp is not None else None
+
+def changes_since(seq: int, limit: int) -> PetChangePage:
+    # Feed entries after `seq`, oldest first; see pet_store_changes.since()
+    if BACKEND == 'sqlite':
+        return pet_store_sqlite.changes_since(seq, limit)
+    return pet_store_changes.since(seq, limit)
 
-def get(pid: str) -> Optional[Pet]:
-    db = load()
-    return db['pets'].get(pid)
+def search(query: str, limit: int, fields: Optional[Collection[str]] = None) -> List[PetSearchHit]:
+    # Best matches for `query` over profile bio, breedGuess and temperamentTags
+    global _profile_index, _profile_index_version
+    with _mutex:
+        if BACKEND == 'sqlite':
+            db = pet_store_sqlite.load()
+            if _profile_index is None or _profile_index_version != db['version']:
+                _profile_index = pet_search.ProfileIndex(pet_store_sqlite.profile_rows())
+                _profile_index_version = db['version']
+            hits = _profile_index.search(query, limit)
+        else:
+            db = load()
+            if _profile_index is None:
+                _profile_index = pet_search.ProfileIndex(_profile_rows(db['pets']))
+            hits = _profile_index.search(query, limit)
+            return [{'score': score, 'pet': _view(db['pets'], pid, fields)} for pid, score in hits]
+    return [{'score': score, 'pet': _project(db['pets'][pid], fields)} for pid, score in hits if pid in db['pets']]
+
+def stats() -> PetStats:
+    # Pets per status and species plus the average age, from the counters
+    global _stats, _stats_version
+    with _mutex:
+        if BACKEND == 'sqlite':
+            version = pet_store_sqlite.load()['version']
+            if _stats is None or _stats_version != version:
+                _stats = pet_stats.ShelterStats(pet_store_sqlite.stats_rows())
+                _stats_version = version
+        else:
+            db = load()
+            if _stats is None:
+                _stats = pet_stats.ShelterStats(
+                    (status, species, 1, age) for _, (status, species, age, _) in _filter_rows(db['pets'])
+                )
+        return _stats.summary()
+
+def check_stats() -> PetStatsCheck:
+    # Recount every pet and report the counters stats() got wrong, if any. A
+    # write landing between the two reads makes the comparison meaningless, so
+    # it is retried up to pet_stats.CHECK_ATTEMPTS times, then given up on.
+    for attempt in range(1, pet_stats.CHECK_ATTEMPTS + 1):
+        tag = version_tag()
+        maintained = stats()
+        recomputed = pet_stats.recount(list_all(('status', 'species', 'ageMonths'))).summary()
+        if version_tag() == tag:
+            drift = pet_stats.drift(maintained, recomputed)
+            return {'result': 'drift' if drift else 'ok', 'attempts': attempt, 'drift': drift}
+    return {'result': 'inconclusive', 'attempts': pet_stats.CHECK_ATTEMPTS, 'drift': []}
 
 def update(pid: str, patch: Dict) -> Optional[Pet]:
-    db = load()
-    cur = db['pets'].get(pid)
-    if not cur:
-        return None
-    
-    next_pet: Pet = {
-        **cur,
-        **patch,
-        'name': patch['name'].strip() if isinstance(patch.get('name'), str) else cur['name'],
-        'ageMonths': max(0, int(patch['ageMonths'])) if isinstance(patch.get('ageMonths'), (int, float)) else cur['ageMonths'],
-        'updatedAt': _now()
-    }
-    db['pets'][pid] = next_pet
-    save(db)
+    with _transaction(pid) as db:
+        cur = db['pets'].get(pid)
+        if not cur:
+            return None
+
+        next_pet = _patched(cur, patch)
+        _write(db, {pid: next_pet})
     return next_pet
 
+def update_many(patches: Dict[str, Dict]) -> Dict[str, Optional[Pet]]:
+    # Per-id result: the updated pet, or None when the id does not exist
+    with _transaction(*patches) as db:
+        results: Dict[str, Optional[Pet]] = {}
+        for pid, patch in patches.items():
+            cur = db['pets'].get(pid)
+            results[pid] = _patched(cur, patch) if cur else None
+        changes = {pid: pet for pid, pet in results.items() if pet}
+        if changes:
+            _write(db, changes)
+    return results
+
 def remove(pid: str) -> bool:
-    db = load()
-    if pid not in db['pets']:
-        return False
-    del db['pets'][pid]
-    save(db)
+    with _transaction(pid) as db:
+        if pid not in db['pets']:
+            return False
+        _write(db, {pid: None})
     return True
 
+def remove_many(pids: List[str]) -> Dict[str, bool]:
+    # Per-id result: True if the pet existed and was removed
+    with _transaction(*pids) as db:
+        results = {pid: pid in db['pets'] for pid in pids}
+        removed = {pid: None for pid, found in results.items() if found}
+        if removed:
+            _write(db, removed)
+    return results
+
 def soft_delete(pid: str) -> Optional[Pet]:
-    db = load()
-    pet = db['pets'].get(pid)
-    if not pet:
-        return None
-    
-    now_ms = _now()
-    updated_pet: Pet = {
-        **pet,
-        'status': 'deleted',
-        'deletedAt': now_ms,
-        'purgeAt': now_ms + (30 * 24 * 60 * 60 * 1000),  # 30 days from now
-        'updatedAt': now_ms
-    }
-    db['pets'][pid] = updated_pet
-    save(db)
+    with _transaction(pid) as db:
+        pet = db['pets'].get(pid)
+        if not pet:
+            return None
+
+        now_ms = _now()
+        updated_pet: Pet = {
+            **pet,
+            'status': 'deleted',
+            'deletedAt': now_ms,
+            'purgeAt': now_ms + (30 * 24 * 60 * 60 * 1000),  # 30 days from now
+            'updatedAt': now_ms
+        }
+        _write(db, {pid: updated_pet})
     return updated_pet
 
 def update_profile(pid: str, profile: Dict) -> Optional[Pet]:
-    db = load()
-    pet = db['pets'].get(pid)
-    if not pet:
-        return None
-    
-    updated_pet: Pet = {
-        **pet,
-        'profile': profile,
-        'updatedAt': _now()
-    }
-    db['pets'][pid] = updated_pet
-    save(db)
+    with _transaction(pid) as db:
+        pet = db['pets'].get(pid)
+        if not pet:
+            return None
+
+        updated_pet: Pet = {
+            **pet,
+            'profile': profile,
+            'updatedAt': _now()
+        }
+        _write(db, {pid: updated_pet})
+    return updated_pet
+
+def add_flag(pid: str, flag: str) -> Optional[Pet]:
+    with _transaction(pid) as db:
+        pet = db['pets'].get(pid)
+        if not pet:
+            return None
+
+        flags = pet.get('flags', [])
+        updated_pet: Pet = {
+            **pet,
+            'flags': flags if flag in flags else flags + [flag],
+            'updatedAt': _now()
+        }
+        _write(db, {pid: updated_pet})
+    return updated_pet
+
+def remove_flag(pid: str, flag: str) -> Optional[Pet]:
+    with _transaction(pid) as db:
+        pet = db['pets'].get(pid)
+        if not pet:
+            return None
+
+        updated_pet: Pet = {
+            **pet,
+            'flags': [f for f in pet.get('flags', []) if f != flag],
+            'updatedAt': _now()
+        }
+        _write(db, {pid: updated_pet})
     return updated_pet
 
 def find_deleted_pets_ready_to_purge() -> List[Pet]:
-    db = load()
-    now_ms = _now()
-    return [
-        pet for pet in db['pets'].values() 
-        if pet['status'] == 'deleted' and pet.get('purgeAt', 0) <= now_ms
-    ]
+    if BACKEND == 'sqlite':
+        return pet_store_sqlite.find_deleted_pets_ready_to_purge(_now())
+    with _mutex:
+        db = load()
+        now_ms = _now()
+        due: Dict[str, Pet] = {}
+        while _purge_heap and _purge_heap[0][0] <= now_ms:
+            purge_at, pid = heapq.heappop(_purge_heap)
+            pet = db['pets'].get(pid)
+            if pet and pet['status'] == 'deleted' and _purge_at(pet) == purge_at:
+                due[pid] = pet
+        # Due pets stay indexed until remove() purges them
+        for pet in due.values():
+            heapq.heappush(_purge_heap, (_purge_at(pet), pet['id']))
+        return list(due.values())
@@ -0,0 +1,137 @@
+# src/services/pet_store_async.py
+# Awaitable versions of the pet_store functions for async step handlers. The
+# store does blocking file I/O (and fsyncs on every write), so calls run on a
+# small shared thread pool instead of the event loop; concurrent writes from
+# the pool threads still join the same group commit. The status history
+# (pet_history.py) and the progression timers (pet_timers.py) are wrapped the
+# same way.
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Collection, Dict, List, Optional
+try:
+    from .types import Pet, PetChangePage, PetFilter, PetPage, PetSearchHit, PetStats, PetStatsCheck
+    from . import pet_history, pet_store, pet_timers
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from types import Pet, PetChangePage, PetFilter, PetPage, PetSearchHit, PetStats, PetStatsCheck
+    import pet_history
+    import pet_store
+    import pet_timers
+
+# Upper bound on store calls in flight; further calls queue in the executor
+MAX_WORKERS = int(os.environ.get('PET_STORE_ASYNC_WORKERS', '4'))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='pet-store')
+        return _executor
+
+async def _run(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+async def create(name: str, species: str, ageMonths: int,
+                 weight_kg: Optional[float] = None, symptoms: Optional[List[str]] = None) -> Pet:
+    return await _run(pet_store.create, name, species, ageMonths, weight_kg=weight_kg, symptoms=symptoms)
+
+async def create_many(items: List[Dict]) -> List[Pet]:
+    return await _run(pet_store.create_many, items)
+
+async def update_status(pid: str, status: str) -> Optional[Pet]:
+    return await _run(pet_store.update_status, pid, status)
+
+async def list_all(fields: Optional[Collection[str]] = None, filters: Optional[PetFilter] = None) -> List[Pet]:
+    return await _run(pet_store.list_all, fields, filters)
+
+async def list_page(limit: int, cursor: Optional[str] = None, fields: Optional[Collection[str]] = None,
+                    filters: Optional[PetFilter] = None) -> PetPage:
+    return await _run(pet_store.list_page, limit, cursor, fields, filters)
+
+async def iter_all(fields: Optional[Collection[str]] = None, batch_size: int = pet_store.ITER_BATCH_SIZE,
+                   filters: Optional[PetFilter] = None) -> AsyncIterator[Pet]:
+    # Same id snapshot and batches as pet_store.iter_all(), each call off the event loop
+    pids = await _run(pet_store.list_ids, filters)
+    for start in range(0, len(pids), batch_size):
+        for pet in await _run(pet_store.get_many, pids[start:start + batch_size], fields):
+            yield pet
+
+async def get(pid: str, fields: Optional[Collection[str]] = None) -> Optional[Pet]:
+    return await _run(pet_store.get, pid, fields)
+
+async def version_tag() -> str:
+    return await _run(pet_store.version_tag)
+
+async def pet_version_tag(pid: str) -> Optional[str]:
+    return await _run(pet_store.pet_version_tag, pid)
+
+async def changes_since(seq: int, limit: int) -> PetChangePage:
+    return await _run(pet_store.changes_since, seq, limit)
+
+async def search(query: str, limit: int, fields: Optional[Collection[str]] = None) -> List[PetSearchHit]:
+    return await _run(pet_store.search, query, limit, fields)
+
+async def stats() -> PetStats:
+    return await _run(pet_store.stats)
+
+async def check_stats() -> PetStatsCheck:
+    return await _run(pet_store.check_stats)
+
+async def update(pid: str, patch: Dict) -> Optional[Pet]:
+    return await _run(pet_store.update, pid, patch)
+
+async def update_many(patches: Dict[str, Dict]) -> Dict[str, Optional[Pet]]:
+    return await _run(pet_store.update_many, patches)
+
+async def remove(pid: str) -> bool:
+    return await _run(pet_store.remove, pid)
+
+async def remove_many(pids: List[str]) -> Dict[str, bool]:
+    return await _run(pet_store.remove_many, pids)
+
+async def soft_delete(pid: str) -> Optional[Pet]:
+    return await _run(pet_store.soft_delete, pid)
+
+async def update_profile(pid: str, profile: Dict) -> Optional[Pet]:
+    return await _run(pet_store.update_profile, pid, profile)
+
+async def add_flag(pid: str, flag: str) -> Optional[Pet]:
+    return await _run(pet_store.add_flag, pid, flag)
+
+async def remove_flag(pid: str, flag: str) -> Optional[Pet]:
+    return await _run(pet_store.remove_flag, pid, flag)
+
+async def find_deleted_pets_ready_to_purge() -> List[Pet]:
+    return await _run(pet_store.find_deleted_pets_ready_to_purge)
+
+async def record_transition(pet: Pet, to_status: str, at: int) -> None:
+    return await _run(pet_history.record, pet, to_status, at)
+
+async def status_history(pid: str) -> List[Dict]:
+    return await _run(pet_history.history, pid)
+
+async def time_in_status(species: Optional[str] = None) -> Dict[str, Dict[str, Dict]]:
+    return await _run(pet_history.time_in_status, species)
+
+async def schedule_progression(pid: str, from_status: str, to_status: str, due: int) -> None:
+    return await _run(pet_timers.schedule, pid, from_status, to_status, due)
+
+async def take_due_progressions(limit: int = pet_timers.BATCH_SIZE) -> List[Dict]:
+    return await _run(pet_timers.take_due, None, limit)
+
+async def ack_progressions(items: List[Dict]) -> None:
+    return await _run(pet_timers.ack, items)
+
+async def pending_progressions() -> int:
+    return await _run(pet_timers.pending)
+
+async def progression_stats() -> Dict:
+    return await _run(pet_timers.stats)
@@ -0,0 +1,192 @@
+# src/services/pet_store_bench.py
+# Micro-benchmark of the Python pet store. For every size it seeds a scratch
+# .data/pets.json with synthetic pets and times each store operation in a
+# fresh process, so peak RSS is per size and the real .data is never touched.
+# The backend and codec come from PET_STORE_BACKEND / PET_STORE_CODEC as usual.
+#
+#   python -m src.services.pet_store_bench                  # 1k, 10k and 100k pets
+#   python -m src.services.pet_store_bench 1000 5000 --out results.json
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+try:
+    from .scratch import run_worker
+except ImportError:
+    sys.path.append(os.path.dirname(__file__))
+    from scratch import run_worker
+
+SIZES = [1_000, 10_000, 100_000]
+OUT_FILE = os.path.join(os.getcwd(), '.data', 'pet_store_bench.json')
+
+# Timed calls per operation. Each operation stops early once it has run for
+# OP_BUDGET_S and has MIN_OPS samples: a json write at 100k pets takes ~1s.
+WRITE_OPS = 200
+GET_OPS = 5_000
+FIND_OPS = 50
+LIST_ALL_OPS = 50
+PURGE_ROUNDS = 10
+OP_BUDGET_S = float(os.environ.get('PET_STORE_BENCH_BUDGET_S', '10'))
+MIN_OPS = 5
+
+SPECIES = ['dog', 'cat', 'bird', 'other']
+STATUSES = ['new', 'in_quarantine', 'healthy', 'available', 'pending', 'adopted', 'ill', 'under_treatment', 'recovered']
+DAY_MS = 24 * 60 * 60 * 1000
+
+def synthetic_pets(count: int, now_ms: int, rng: random.Random) -> Dict[str, Dict]:
+    # A third with an AI profile; 1% soft-deleted and already due for purging
+    pets = {}
+    for n in range(1, count + 1):
+        pid = str(n)
+        updated_at = now_ms - rng.randrange(90 * DAY_MS)
+        pet = {
+            'id': pid,
+            'name': f'Pet {n}',
+            'species': rng.choice(SPECIES),
+            'ageMonths': rng.randrange(1, 180),
+            'status': rng.choice(STATUSES),
+            'createdAt': updated_at - rng.randrange(30 * DAY_MS),
+            'updatedAt': updated_at,
+            'weightKg': round(rng.uniform(0.1, 60), 1),
+        }
+        if n % 3 == 0:
+            pet['profile'] = {
+                'bio': f'Pet {n} is a friendly companion who loves long walks and quiet evenings.',
+                'breedGuess': 'mixed',
+                'temperamentTags': ['friendly', 'calm', 'playful'],
+                'adopterHints': 'Best with an experienced owner and a garden.',
+            }
+        if n % 100 == 0:
+            pet.update({'status': 'deleted', 'deletedAt': updated_at, 'purgeAt': now_ms - DAY_MS})
+        pets[pid] = pet
+    return pets
+
+def _percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def _measure(samples_ns: List[int]) -> Dict:
+    samples = [ns / 1e6 for ns in samples_ns]
+    total = sum(samples)
+    return {
+        'ops': len(samples),
+        'opsPerSec': round(len(samples) / (total / 1000), 1) if total else None,
+        'p50Ms': round(_percentile(samples, 0.50), 4),
+        'p99Ms': round(_percentile(samples, 0.99), 4),
+    }
+
+def _time(fn: Callable, args: List) -> List[int]:
+    samples = []
+    deadline = time.perf_counter_ns() + int(OP_BUDGET_S * 1e9)
+    for arg in args:
+        start = time.perf_counter_ns()
+        fn(*arg)
+        samples.append(time.perf_counter_ns() - start)
+        if len(samples) >= MIN_OPS and start > deadline:
+            break
+    return samples
+
+def _peak_rss() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KiB elsewhere
+
+def run_size(size: int) -> Dict:
+    # Runs in a worker whose cwd is a scratch directory: seed, then time
+    rng = random.Random(size)
+    now_ms = int(time.time() * 1000)
+    os.makedirs('.data', exist_ok=True)
+    with open(os.path.join('.data', 'pets.json'), 'w') as f:
+        json.dump({'seq': size + 1, 'version': 0, 'pets': synthetic_pets(size, now_ms, rng)}, f)
+
+    from src.services import pet_store, pet_store_codec
+    if pet_store.CODEC == 'binary':
+        pet_store_codec.convert(os.path.join('.data', 'pets.json'), pet_store.FILE)
+    results: Dict[str, Dict] = {}
+    start = time.perf_counter_ns()
+    pet_store.load()
+    results['load'] = _measure([time.perf_counter_ns() - start])
+
+    ids = [str(n) for n in range(1, size + 1) if n % 100]
+    results['get'] = _measure(_time(pet_store.get, [(rng.choice(ids),) for _ in range(GET_OPS)]))
+    results['list_all'] = _measure(_time(pet_store.list_all, [()] * LIST_ALL_OPS))
+    results['find_deleted_pets_ready_to_purge'] = _measure(
+        _time(pet_store.find_deleted_pets_ready_to_purge, [()] * FIND_OPS)
+    )
+    results['create'] = _measure(_time(
+        pet_store.create, [(f'Bench {n}', rng.choice(SPECIES), rng.randrange(1, 180)) for n in range(WRITE_OPS)]
+    ))
+    results['update'] = _measure(_time(
+        pet_store.update, [(rng.choice(ids), {'name': f'Renamed {n}'}) for n in range(WRITE_OPS)]
+    ))
+    doomed = rng.sample(ids, WRITE_OPS + PURGE_ROUNDS * max(10, size // 100))
+    results['soft_delete'] = _measure(_time(pet_store.soft_delete, [(pid,) for pid in doomed[:WRITE_OPS]]))
+
+    # Reaper pass: find the due pets and remove them with one remove_many().
+    # Each round first makes a fresh 1% of the pets due (untimed).
+    due = doomed[WRITE_OPS:]
+    per_round = len(due) // PURGE_ROUNDS
+
+    def purge(batch: List[str]) -> None:
+        pet_store.update_many({pid: {'status': 'deleted', 'deletedAt': now_ms, 'purgeAt': now_ms - DAY_MS} for pid in batch})
+        start = time.perf_counter_ns()
+        reaped = pet_store.find_deleted_pets_ready_to_purge()
+        pet_store.remove_many([pet['id'] for pet in reaped])
+        purge_samples.append(time.perf_counter_ns() - start)
+
+    purge_samples: List[int] = []
+    _time(purge, [(due[n * per_round:(n + 1) * per_round],) for n in range(PURGE_ROUNDS)])
+    results['purge'] = _measure(purge_samples)
+
+    return {'size': size, 'operations': results, 'peakRssBytes': _peak_rss()}
+
+def run(sizes: List[int]) -> Dict:
+    runs = []
+    for size in sizes:
+        out = run_worker('src.services.pet_store_bench', [str(size)], check=True, stdout=subprocess.PIPE, text=True).stdout
+        runs.append(json.loads(out))
+    return {
+        'backend': os.environ.get('PET_STORE_BACKEND', 'json'),
+        'codec': os.environ.get('PET_STORE_CODEC', 'json'),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'startedAt': int(time.time() * 1000),
+        'runs': runs,
+    }
+
+def _report(results: Dict) -> None:
+    print(f"backend={results['backend']} codec={results['codec']} python={results['python']}")
+    for entry in results['runs']:
+        rss = entry['peakRssBytes']
+        print(f"\n{entry['size']} pets, peak RSS {rss / 2**20:.1f} MiB" if rss else f"\n{entry['size']} pets")
+        print(f"  {'operation':<34}{'ops':>6}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, m in entry['operations'].items():
+            print(f"  {name:<34}{m['ops']:>6}{m['opsPerSec'] or 0:>12.1f}{m['p50Ms']:>10.3f}{m['p99Ms']:>10.3f}")
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['--worker']:
+        print(json.dumps(run_size(int(args[1]))))
+        sys.exit(0)
+    out_file = OUT_FILE
+    if '--out' in args:
+        i = args.index('--out')
+        out_file = args[i + 1]
+        del args[i:i + 2]
+    if not all(arg.isdigit() for arg in args):
+        print('usage: python -m src.services.pet_store_bench [size ...] [--out results.json]')
+        sys.exit(2)
+    results = run([int(arg) for arg in args] or SIZES)
+    os.makedirs(os.path.dirname(os.path.abspath(out_file)), exist_ok=True)
+    with open(out_file, 'w') as f:
+        json.dump(results, f, indent=2)
+    _report(results)
+    print(f'\nResults written to {out_file}')
@@ -0,0 +1,69 @@
+# src/services/pet_store_changes.py
+# Change feed for the json, log and sharded backends (sqlite keeps it in a
+# table, see pet_store_sqlite.py). .data/pets.changes holds one JSON line per
+# changed pet, {"seq", "op", "id", "fields"}, numbered by its own sequence.
+# Appends take .data/pets.changes.lock (file_io.JsonLinesLog), since writers
+# to different shards do not share a store lock. Once the file holds twice
+# CHANGES_RETENTION entries it is rewritten with the newest CHANGES_RETENTION.
+import bisect
+import os
+from typing import List, Tuple
+try:
+    from .types import PetChange, PetChangePage
+    from .file_io import JsonLinesLog
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from types import PetChange, PetChangePage
+    from file_io import JsonLinesLog
+
+DATA_DIR = os.path.join(os.getcwd(), '.data')
+FILE = os.path.join(DATA_DIR, 'pets.changes')
+LOCK_FILE = os.path.join(DATA_DIR, 'pets.changes.lock')
+CHANGES_RETENTION = int(os.environ.get('PET_STORE_CHANGES_RETENTION', '10000'))
+
+# The feed folded so far; like pet_history.py, a process that sees the file
+# grow reads only the new tail, and a trim (new inode) refolds it once
+_entries: List[PetChange] = []
+_seqs: List[int] = []
+
+def _reset() -> None:
+    global _entries, _seqs
+    _entries = []
+    _seqs = []
+
+def _fold(entry: PetChange) -> None:
+    _entries.append(entry)
+    _seqs.append(entry['seq'])
+
+_log = JsonLinesLog(FILE, LOCK_FILE, _fold, _reset)
+
+def append(changes: List[Tuple[str, str, List[str]]]) -> None:
+    # changes: (op, id, changed fields), numbered in order
+    global _entries, _seqs
+    if not changes:
+        return
+    with _log.writing():
+        seq = _seqs[-1] if _seqs else 0
+        entries = [
+            {'seq': seq + n, 'op': op, 'id': pid, 'fields': fields}
+            for n, (op, pid, fields) in enumerate(changes, 1)
+        ]
+        if len(_entries) + len(entries) >= 2 * CHANGES_RETENTION:
+            _entries = (_entries + entries)[-CHANGES_RETENTION:]
+            _seqs = [e['seq'] for e in _entries]
+            _log.rewrite(_entries)
+        else:
+            _log.append(entries)
+
+def since(seq: int, limit: int) -> PetChangePage:
+    # Entries after `seq`, oldest first. When entries after `seq` have been
+    # trimmed already the page is a reset: the consumer re-lists, then tails
+    # from nextSince.
+    with _log.reading():
+        latest = _seqs[-1] if _seqs else 0
+        if _seqs and seq < _seqs[0] - 1:
+            return {'changes': [], 'nextSince': latest, 'reset': True}
+        start = bisect.bisect_right(_seqs, seq)
+        entries = _entries[start:start + limit]
+    return {'changes': entries, 'nextSince': entries[-1]['seq'] if entries else min(seq, latest), 'reset': False}
@@ -0,0 +1,167 @@
+# src/services/pet_store_codec.py
+# Binary snapshot format for PET_STORE_CODEC=binary (.data/pets.bin):
+#
+#   header   magic 'PETS', format version, seq, database version, record count, table offset
+#   records  u32 length + one pet as compact JSON, back to back
+#   table    per pet: u16 id length, id, offset, length, updatedAt, purgeAt, pet version, flags
+#
+# The file is memory-mapped and only the table is parsed on load, so get()
+# decodes a single record. The table also carries the fields the store
+# indexes on, so building those indexes does not touch the records.
+#
+# Converting an existing install (compact the log first with PET_STORE_BACKEND=log):
+#   python -m src.services.pet_store_codec to-binary
+#   python -m src.services.pet_store_codec to-json
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Optional, Tuple
+try:
+    from .types import Pet
+    from .file_io import atomic_write
+except ImportError:
+    sys.path.append(os.path.dirname(__file__))
+    from types import Pet
+    from file_io import atomic_write
+
+DATA_DIR = os.path.join(os.getcwd(), '.data')
+JSON_FILE = os.path.join(DATA_DIR, 'pets.json')
+BINARY_FILE = os.path.join(DATA_DIR, 'pets.bin')
+
+MAGIC = b'PETS'
+VERSION = 2
+HEADER = struct.Struct('<4sHxxqqIQ')
+LENGTH = struct.Struct('<I')
+ID_LENGTH = struct.Struct('<H')
+ENTRY = struct.Struct('<QIqqqB')
+
+# ENTRY flags
+DELETED = 1
+HAS_PURGE_AT = 2
+
+def _entry(offset: int, length: int, pet: Pet) -> tuple:
+    flags = (DELETED if pet['status'] == 'deleted' else 0) | (HAS_PURGE_AT if 'purgeAt' in pet else 0)
+    return (offset, length, pet['updatedAt'], pet.get('purgeAt', 0), pet.get('version', 0), flags)
+
+class MappedPets(MutableMapping):
+    """DbShape['pets'] over a mapped snapshot plus the pets written since it was loaded."""
+
+    def __init__(self, buf, entries: Dict[str, tuple]):
+        self._buf = buf
+        # On-disk pets that have not been replaced or removed since load
+        self._entries = entries
+        self._written: Dict[str, Pet] = {}
+
+    def __getitem__(self, pid: str) -> Pet:
+        pet = self._written.get(pid)
+        if pet is not None:
+            return pet
+        offset, length = self._entries[pid][:2]
+        return json.loads(self._buf[offset:offset + length])
+
+    def __setitem__(self, pid: str, pet: Pet) -> None:
+        self._entries.pop(pid, None)
+        self._written[pid] = pet
+
+    def __delitem__(self, pid: str) -> None:
+        if self._written.pop(pid, None) is None:
+            del self._entries[pid]
+
+    def __contains__(self, pid: object) -> bool:
+        return pid in self._written or pid in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._entries
+        yield from self._written
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._written)
+
+    def index_rows(self) -> Iterator[Tuple[str, int, Optional[int]]]:
+        # (id, updatedAt, purgeAt of a soft-deleted pet or None) without decoding
+        # records; a soft-deleted pet without purgeAt is due at once (0)
+        for pid, (_, _, updated_at, purge_at, _, flags) in self._entries.items():
+            if flags & DELETED:
+                yield pid, updated_at, purge_at if flags & HAS_PURGE_AT else 0
+            else:
+                yield pid, updated_at, None
+        for pid, pet in self._written.items():
+            yield pid, pet['updatedAt'], (pet.get('purgeAt') or 0) if pet['status'] == 'deleted' else None
+
+    def version_of(self, pid: str) -> Optional[Tuple[int, int]]:
+        # (pet version, updatedAt) without decoding the record; None if missing
+        pet = self._written.get(pid)
+        if pet is not None:
+            return pet.get('version', 0), pet['updatedAt']
+        entry = self._entries.get(pid)
+        return (entry[4], entry[2]) if entry is not None else None
+
+    def raw(self, pid: str) -> Optional[tuple]:
+        # Encoded bytes and table entry of an unchanged on-disk pet, else None
+        entry = self._entries.get(pid)
+        if entry is None:
+            return None
+        offset, length = entry[:2]
+        return self._buf[offset:offset + length], entry
+
+def dump(db: Dict) -> bytes:
+    pets = db['pets']
+    out = bytearray(HEADER.size)
+    table = bytearray()
+    for pid in pets:
+        raw = pets.raw(pid) if isinstance(pets, MappedPets) else None
+        if raw is not None:
+            data, entry = raw
+            entry = (len(out) + LENGTH.size,) + entry[1:]
+        else:
+            pet = pets[pid]
+            data = json.dumps(pet, separators=(',', ':')).encode()
+            entry = _entry(len(out) + LENGTH.size, len(data), pet)
+        out += LENGTH.pack(len(data))
+        out += data
+        key = pid.encode()
+        table += ID_LENGTH.pack(len(key)) + key + ENTRY.pack(*entry)
+    HEADER.pack_into(out, 0, MAGIC, VERSION, db['seq'], db.get('version', 0), len(pets), len(out))
+    out += table
+    return bytes(out)
+
+def load(path: str) -> Dict:
+    with open(path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buf) < HEADER.size:
+        raise ValueError(f'{path} is not a pet snapshot')
+    magic, format_version, seq, version, count, pos = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or format_version != VERSION:
+        raise ValueError(f'{path} is not a version {VERSION} pet snapshot')
+    entries: Dict[str, tuple] = {}
+    for _ in range(count):
+        (key_length,) = ID_LENGTH.unpack_from(buf, pos)
+        pos += ID_LENGTH.size
+        pid = buf[pos:pos + key_length].decode()
+        pos += key_length
+        entries[pid] = ENTRY.unpack_from(buf, pos)
+        pos += ENTRY.size
+    return {'seq': seq, 'version': version, 'pets': MappedPets(buf, entries)}
+
+def convert(src: str, dst: str) -> int:
+    # Rewrite a snapshot in the other format, picked from the file extensions
+    if src.endswith('.bin'):
+        db = load(src)
+        db = {'seq': db['seq'], 'version': db['version'], 'pets': dict(db['pets'].items())}
+    else:
+        with open(src, 'r') as f:
+            db = json.load(f)
+    atomic_write(dst, dump(db) if dst.endswith('.bin') else json.dumps(db))
+    return len(db['pets'])
+
+if __name__ == '__main__':
+    directions = {'to-binary': (JSON_FILE, BINARY_FILE), 'to-json': (BINARY_FILE, JSON_FILE)}
+    if len(sys.argv) not in (2, 4) or sys.argv[1] not in directions:
+        print('usage: python -m src.services.pet_store_codec to-binary|to-json [src dst]')
+        sys.exit(2)
+    src, dst = sys.argv[2:] if len(sys.argv) == 4 else directions[sys.argv[1]]
+    count = convert(src, dst)
+    print(f'Converted {count} pets from {src} to {dst}')
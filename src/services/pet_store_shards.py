@@ -0,0 +1,140 @@
+# src/services/pet_store_shards.py
+# Layout for PET_STORE_BACKEND=sharded: pets are hash-partitioned by id across
+# .data/shards/pets-NNN.json, and .data/shards/meta.json holds the shard count
+# and the id sequence. Each shard (and the meta file) has its own lock file.
+# Shards carry their own change version; the database version is their sum.
+#
+# Offline resharding (stop the workers first):
+#   python -m src.services.pet_store_shards reshard 16
+import json
+import os
+import shutil
+import sys
+import zlib
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Tuple
+try:
+    from .types import Pet
+    from .file_io import atomic_write, fsync_dir
+except ImportError:
+    sys.path.append(os.path.dirname(__file__))
+    from types import Pet
+    from file_io import atomic_write, fsync_dir
+
+DATA_DIR = os.path.join(os.getcwd(), '.data')
+SHARD_DIR = os.path.join(DATA_DIR, 'shards')
+META_FILE = os.path.join(SHARD_DIR, 'meta.json')
+JSON_FILE = os.path.join(DATA_DIR, 'pets.json')
+
+# Only used when the layout is created; afterwards meta.json is authoritative
+SHARD_COUNT = int(os.environ.get('PET_STORE_SHARDS', '8'))
+
+def shard_of(pid: str, count: int) -> int:
+    return zlib.crc32(pid.encode()) % count
+
+def shard_file(index: int, shard_dir: str = SHARD_DIR) -> str:
+    return os.path.join(shard_dir, f'pets-{index:03d}.json')
+
+def lock_name(index: int) -> str:
+    return f'pets-{index:03d}'
+
+def lock_file(name: str) -> str:
+    return os.path.join(SHARD_DIR, f'{name}.lock')
+
+class ShardedPets(MutableMapping):
+    """DbShape['pets'] over a list of per-shard dicts, routing each id to its shard."""
+
+    def __init__(self, shards: List[Dict[str, Pet]], versions: Optional[List[int]] = None):
+        self.shards = shards
+        self.versions = versions if versions is not None else [0] * len(shards)
+
+    def shard(self, pid: str) -> Dict[str, Pet]:
+        return self.shards[shard_of(pid, len(self.shards))]
+
+    def __getitem__(self, pid: str) -> Pet:
+        return self.shard(pid)[pid]
+
+    def __setitem__(self, pid: str, pet: Pet) -> None:
+        self.shard(pid)[pid] = pet
+
+    def __delitem__(self, pid: str) -> None:
+        del self.shard(pid)[pid]
+
+    def __contains__(self, pid: object) -> bool:
+        return isinstance(pid, str) and pid in self.shard(pid)
+
+    def get(self, pid: str, default=None):
+        return self.shard(pid).get(pid, default)
+
+    def __iter__(self) -> Iterator[str]:
+        for shard in self.shards:
+            yield from shard
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+def read_meta() -> Dict:
+    with open(META_FILE, 'r') as f:
+        return json.load(f)
+
+def read_shard(index: int) -> Tuple[Dict[str, Pet], int]:
+    with open(shard_file(index), 'r') as f:
+        shard = json.load(f)
+    return shard['pets'], shard.get('version', 0)
+
+def dump_meta(count: int, seq: int) -> str:
+    return json.dumps({'shards': count, 'seq': seq})
+
+def dump_shard(pets: Dict[str, Pet], version: int) -> str:
+    return json.dumps({'version': version, 'pets': pets})
+
+def ensure_layout() -> None:
+    # First start: split the existing pets.json (if any) into SHARD_COUNT shards
+    if os.path.exists(META_FILE):
+        return
+    seq, version, pets = 1, 0, {}
+    if os.path.exists(JSON_FILE):
+        with open(JSON_FILE, 'r') as f:
+            db = json.load(f)
+        seq, version, pets = db['seq'], db.get('version', 0), db['pets']
+    _write_layout(SHARD_DIR, SHARD_COUNT, seq, version, pets)
+
+def _write_layout(shard_dir: str, count: int, seq: int, version: int, pets: Dict[str, Pet]) -> None:
+    # Every shard starts at `version`, so the summed database version never goes back
+    os.makedirs(shard_dir, exist_ok=True)
+    shards: List[Dict[str, Pet]] = [{} for _ in range(count)]
+    for pid, pet in pets.items():
+        shards[shard_of(pid, count)][pid] = pet
+    for index, shard in enumerate(shards):
+        atomic_write(shard_file(index, shard_dir), dump_shard(shard, version))
+    # meta.json last: a layout without it is incomplete and gets rebuilt
+    atomic_write(os.path.join(shard_dir, 'meta.json'), dump_meta(count, seq))
+
+def reshard(count: int) -> None:
+    # Offline: rewrite every pet into `count` shards and swap the directory in
+    if count < 1:
+        raise ValueError('Shard count must be at least 1')
+    ensure_layout()
+    meta = read_meta()
+    pets: Dict[str, Pet] = {}
+    version = 0
+    for index in range(meta['shards']):
+        shard, shard_version = read_shard(index)
+        pets.update(shard)
+        version += shard_version
+    staging = SHARD_DIR + '.new'
+    retired = SHARD_DIR + '.old'
+    shutil.rmtree(staging, ignore_errors=True)
+    _write_layout(staging, count, meta['seq'], version, pets)
+    shutil.rmtree(retired, ignore_errors=True)
+    os.replace(SHARD_DIR, retired)
+    os.replace(staging, SHARD_DIR)
+    fsync_dir(DATA_DIR)
+    shutil.rmtree(retired)
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3 or sys.argv[1] != 'reshard':
+        print('usage: python -m src.services.pet_store_shards reshard <count>')
+        sys.exit(2)
+    reshard(int(sys.argv[2]))
+    print(f'Resharded pets into {sys.argv[2]} shards under {SHARD_DIR}')
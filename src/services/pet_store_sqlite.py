@@ -0,0 +1,253 @@
+# src/services/pet_store_sqlite.py
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+try:
+    from .types import Pet, PetChangePage, PetFilter
+    from .pet_store_changes import CHANGES_RETENTION
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from types import Pet, PetChangePage, PetFilter
+    from pet_store_changes import CHANGES_RETENTION
+
+DATA_DIR = os.path.join(os.getcwd(), '.data')
+DB_FILE = os.path.join(DATA_DIR, 'pets.db')
+JSON_FILE = os.path.join(DATA_DIR, 'pets.json')
+
+# The full record lives in `data`; the columns next to it are copies of the
+# fields we filter and sort on so those queries can use an index.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS pets (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    species TEXT NOT NULL,
+    updatedAt INTEGER NOT NULL,
+    purgeAt INTEGER,
+    data TEXT NOT NULL
+);
+-- Filtered listings walk these in list order (updatedAt DESC, id) from the cursor
+DROP INDEX IF EXISTS idx_pets_status;
+DROP INDEX IF EXISTS idx_pets_species;
+CREATE INDEX IF NOT EXISTS idx_pets_status_updated ON pets(status, updatedAt DESC, id);
+CREATE INDEX IF NOT EXISTS idx_pets_species_updated ON pets(species, updatedAt DESC, id);
+CREATE INDEX IF NOT EXISTS idx_pets_updated_at ON pets(updatedAt);
+CREATE INDEX IF NOT EXISTS idx_pets_purge_at ON pets(purgeAt) WHERE purgeAt IS NOT NULL;
+-- A soft-deleted pet without purgeAt is due at once (see _row)
+UPDATE pets SET purgeAt = 0 WHERE status = 'deleted' AND purgeAt IS NULL;
+CREATE INDEX IF NOT EXISTS idx_pets_age ON pets(json_extract(data, '$.ageMonths'));
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    id TEXT NOT NULL,
+    fields TEXT NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
+_local = threading.local()
+
+def connect() -> sqlite3.Connection:
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        return conn
+    os.makedirs(DATA_DIR, exist_ok=True)
+    conn = sqlite3.connect(DB_FILE, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    _seed(conn)
+    _local.conn = conn
+    return conn
+
+def _seed(conn: sqlite3.Connection) -> None:
+    # First start on an existing install: import pets.json once
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'seq'").fetchone():
+            conn.execute('COMMIT')
+            return
+        seq, version, pets = 1, 0, {}
+        if os.path.exists(JSON_FILE):
+            with open(JSON_FILE, 'r') as f:
+                db = json.load(f)
+            seq, version, pets = db['seq'], db.get('version', 0), db['pets']
+        conn.execute("INSERT INTO meta (key, value) VALUES ('seq', ?)", (seq,))
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'version'", (version,))
+        conn.executemany(_UPSERT, [_row(pet) for pet in pets.values()])
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+_UPSERT = (
+    'INSERT INTO pets (id, status, species, updatedAt, purgeAt, data) VALUES (?, ?, ?, ?, ?, ?) '
+    'ON CONFLICT(id) DO UPDATE SET status = excluded.status, species = excluded.species, '
+    'updatedAt = excluded.updatedAt, purgeAt = excluded.purgeAt, data = excluded.data'
+)
+
+def _row(pet: Pet) -> tuple:
+    # A soft-deleted pet without purgeAt is due at once, so it gets 0
+    purge_at = pet.get('purgeAt')
+    if purge_at is None and pet['status'] == 'deleted':
+        purge_at = 0
+    return (pet['id'], pet['status'], pet['species'], pet['updatedAt'], purge_at, json.dumps(pet))
+
+class SqlitePets(Mapping):
+    """Read-only view of the pets table shaped like DbShape['pets']."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __getitem__(self, pid: str) -> Pet:
+        row = self._conn.execute('SELECT data FROM pets WHERE id = ?', (pid,)).fetchone()
+        if row is None:
+            raise KeyError(pid)
+        return json.loads(row[0])
+
+    def __contains__(self, pid: object) -> bool:
+        return self._conn.execute('SELECT 1 FROM pets WHERE id = ?', (pid,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self._conn.execute('SELECT id FROM pets'))
+
+    def __len__(self) -> int:
+        return self._conn.execute('SELECT COUNT(*) FROM pets').fetchone()[0]
+
+    def values(self) -> List[Pet]:
+        return [json.loads(row[0]) for row in self._conn.execute('SELECT data FROM pets')]
+
+    def version_of(self, pid: str) -> Optional[Tuple[int, int]]:
+        row = self._conn.execute(
+            "SELECT IFNULL(json_extract(data, '$.version'), 0), updatedAt FROM pets WHERE id = ?", (pid,)
+        ).fetchone()
+        return tuple(row) if row is not None else None
+
+def load() -> Dict:
+    conn = connect()
+    meta = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('seq', 'version')"))
+    return {'seq': meta['seq'], 'version': meta['version'], 'pets': SqlitePets(conn)}
+
+@contextmanager
+def transaction():
+    # BEGIN IMMEDIATE takes the write lock up front, so the reads of a
+    # load-modify-write cannot go stale before the write
+    conn = connect()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+def write(db: Dict, changes: Dict[str, Optional[Pet]], feed: List[tuple]) -> None:
+    # feed: change feed entries (op, id, changed fields), committed with the pets
+    with transaction() as conn:
+        conn.execute("UPDATE meta SET value = MAX(value, ?) WHERE key = 'seq'", (db['seq'],))
+        conn.execute("UPDATE meta SET value = MAX(value, ?) WHERE key = 'version'", (db['version'],))
+        for pid, pet in changes.items():
+            if pet is None:
+                conn.execute('DELETE FROM pets WHERE id = ?', (pid,))
+            else:
+                conn.execute(_UPSERT, _row(pet))
+        if feed:
+            conn.executemany(
+                'INSERT INTO changes (op, id, fields) VALUES (?, ?, ?)',
+                [(op, pid, json.dumps(fields)) for op, pid, fields in feed]
+            )
+            last = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()[0]
+            conn.execute('DELETE FROM changes WHERE seq <= ?', (last - CHANGES_RETENTION,))
+
+def data_version() -> int:
+    # Changes when another connection commits (see pet_store's hot-pet cache)
+    return connect().execute('PRAGMA data_version').fetchone()[0]
+
+def version_stamp() -> tuple:
+    # (version, seq, pet count, newest updatedAt), see pet_store.version_tag()
+    conn = connect()
+    meta = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('seq', 'version')"))
+    count, newest = conn.execute('SELECT COUNT(*), IFNULL(MAX(updatedAt), 0) FROM pets').fetchone()
+    return meta['version'], meta['seq'], count, newest
+
+def changes_since(seq: int, limit: int) -> PetChangePage:
+    # Same page shape as pet_store_changes.since()
+    conn = connect()
+    oldest, latest = conn.execute('SELECT MIN(seq), IFNULL(MAX(seq), 0) FROM changes').fetchone()
+    if oldest is not None and seq < oldest - 1:
+        return {'changes': [], 'nextSince': latest, 'reset': True}
+    rows = conn.execute('SELECT seq, op, id, fields FROM changes WHERE seq > ? ORDER BY seq LIMIT ?', (seq, limit))
+    entries = [{'seq': s, 'op': op, 'id': pid, 'fields': json.loads(fields)} for s, op, pid, fields in rows]
+    return {'changes': entries, 'nextSince': entries[-1]['seq'] if entries else min(seq, latest), 'reset': False}
+
+def profile_rows() -> Iterator[tuple]:
+    # (id, profile) of every pet with a profile
+    rows = connect().execute(
+        "SELECT id, json_extract(data, '$.profile') FROM pets WHERE json_extract(data, '$.profile') IS NOT NULL"
+    )
+    return ((pid, json.loads(profile)) for pid, profile in rows)
+
+def stats_rows() -> Iterator[tuple]:
+    # (status, species, pets, summed ageMonths) per group
+    return connect().execute(
+        "SELECT status, species, COUNT(*), SUM(json_extract(data, '$.ageMonths')) FROM pets GROUP BY status, species"
+    )
+
+def _where(filters: Optional[PetFilter], after: Optional[tuple] = None) -> Tuple[str, list]:
+    # WHERE clause for list filters and a keyset cursor; the age conditions
+    # match the idx_pets_age expression so they can use it
+    clauses, params = [], []
+    filters = filters or {}
+    if 'status' in filters:
+        clauses.append('status = ?')
+        params.append(filters['status'])
+    if 'species' in filters:
+        clauses.append('species = ?')
+        params.append(filters['species'])
+    if 'minAgeMonths' in filters:
+        clauses.append("json_extract(data, '$.ageMonths') >= ?")
+        params.append(filters['minAgeMonths'])
+    if 'maxAgeMonths' in filters:
+        clauses.append("json_extract(data, '$.ageMonths') <= ?")
+        params.append(filters['maxAgeMonths'])
+    if after is not None:
+        updated_at, pid = after
+        # The leading updatedAt <= ? lets the cursor seek into the index
+        clauses.append('updatedAt <= ? AND (updatedAt < ? OR id > ?)')
+        params.extend([updated_at, updated_at, pid])
+    return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+def list_all(filters: Optional[PetFilter] = None) -> List[Pet]:
+    where, params = _where(filters)
+    rows = connect().execute(f'SELECT data FROM pets{where} ORDER BY updatedAt DESC, id', params)
+    return [json.loads(row[0]) for row in rows]
+
+def list_page(limit: int, after: Optional[tuple] = None, filters: Optional[PetFilter] = None) -> List[Pet]:
+    # Keyset pagination: one row past the page tells the caller there is more
+    where, params = _where(filters, after)
+    rows = connect().execute(f'SELECT data FROM pets{where} ORDER BY updatedAt DESC, id LIMIT ?', params + [limit + 1])
+    return [json.loads(row[0]) for row in rows]
+
+def list_ids(filters: Optional[PetFilter] = None) -> List[str]:
+    where, params = _where(filters)
+    return [row[0] for row in connect().execute(f'SELECT id FROM pets{where} ORDER BY updatedAt DESC, id', params)]
+
+def get_many(pids: List[str]) -> List[Pet]:
+    # The pets of `pids` that still exist, in that order
+    placeholders = ','.join('?' * len(pids))
+    rows = dict(connect().execute(f'SELECT id, data FROM pets WHERE id IN ({placeholders})', pids))
+    return [json.loads(rows[pid]) for pid in pids if pid in rows]
+
+def find_deleted_pets_ready_to_purge(now_ms: int) -> List[Pet]:
+    rows = connect().execute(
+        "SELECT data FROM pets WHERE purgeAt <= ? AND status = 'deleted'", (now_ms,)
+    )
+    return [json.loads(row[0]) for row in rows]
@@ -0,0 +1,253 @@
+# src/services/pet_timers.py
+# Durable timers for the orchestrator's automatic status progressions
+# (healthy -> available, ill -> under_treatment, recovered -> healthy).
+#
+# Every schedule and every firing is one compact JSON array appended to
+# .data/progression_timers.log, so pending progressions survive a restart:
+#   ['add', id, due, from, to]      progression of pet `id` due at `due` (ms)
+#   ['lease', id, due, until]       handed out to a worker until `until` (ms)
+#   ['done', id, due, firedAt]      the worker emitted it
+#   ['stats', fired, [lagMs, ...]]  counters carried over a compaction
+# A pet has at most one pending progression; a newer 'add' replaces it.
+#
+# Like pet_history.py, readers fold the log incrementally through
+# file_io.JsonLinesLog, which also does the locked appends. The folded timers
+# sit in a hierarchical timing wheel, so finding what is due costs time in
+# proportion to the elapsed ticks and the due timers, not to all pending ones.
+# take_due() leases due progressions in batches under the file lock, so two
+# workers never fire the same one at once. A progression stays pending until
+# the worker confirms the emit with ack(); if it never does (the emit failed,
+# the worker died) the lease runs out and the progression is due again. So
+# each progression fires at least once; a repeat is skipped by the
+# orchestrator because the pet has left the status it was scheduled from.
+import bisect
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+try:
+    from .file_io import JsonLinesLog
+    from .pet_history import percentile
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from file_io import JsonLinesLog
+    from pet_history import percentile
+
+DATA_DIR = os.path.join(os.getcwd(), '.data')
+FILE = os.path.join(DATA_DIR, 'progression_timers.log')
+LOCK_FILE = os.path.join(DATA_DIR, 'progression_timers.lock')
+# Wheel resolution; a timer fires up to one tick after it is due
+TICK_MS = int(os.environ.get('PET_TIMER_TICK_MS', '100'))
+SLOTS = 64
+LEVELS = 4
+# Most progressions handed out by one take_due() call
+BATCH_SIZE = int(os.environ.get('PET_TIMER_BATCH_SIZE', '100'))
+# How long a handed-out progression waits for its ack() before it is due again
+LEASE_MS = int(os.environ.get('PET_TIMER_LEASE_MS', '30000'))
+# Firing lags kept for the percentiles in stats()
+LAG_SAMPLES = 1000
+# The log is rewritten with only the pending timers once it holds this many
+# lines and at least four times as many as there are pending timers
+COMPACT_LINES = 1000
+DEFAULT_DELAY_MS = 1500
+
+def _delays(spec: str) -> Dict[str, int]:
+    # 'healthy=1500,ill=60000' -> {'healthy': 1500, 'ill': 60000}
+    delays = {}
+    for part in spec.split(','):
+        if part.strip():
+            status, _, delay = part.partition('=')
+            delays[status.strip()] = int(delay)
+    return delays
+
+# Delay before each status progresses automatically, per status it leaves
+DELAYS_MS = _delays(os.environ.get('PET_PROGRESSION_DELAYS_MS', ''))
+
+def delay_ms(status: str) -> int:
+    return DELAYS_MS.get(status, DEFAULT_DELAY_MS)
+
+class TimerWheel:
+    """LEVELS rings of SLOTS slots; a slot of level n spans a whole ring of level n - 1."""
+
+    def __init__(self, tick: int):
+        self.tick = tick
+        self.rings: List[List[List[tuple]]] = [[[] for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self.overflow: List[tuple] = []
+        self.expired: List[tuple] = []
+        # Timers per ring, to skip ticks that cannot release or cascade anything
+        self.sizes = [0] * LEVELS
+
+    def add(self, due_tick: int, key: tuple) -> None:
+        self._place(due_tick, key)
+
+    def _place(self, due_tick: int, key: tuple) -> None:
+        delta = due_tick - self.tick
+        if delta <= 0:
+            self.expired.append(key)
+            return
+        span = 1
+        for level, ring in enumerate(self.rings):
+            if delta < span * SLOTS:
+                ring[(due_tick // span) % SLOTS].append((due_tick, key))
+                self.sizes[level] += 1
+                return
+            span *= SLOTS
+        self.overflow.append((due_tick, key))
+
+    def advance(self, tick: int) -> List[tuple]:
+        # Keys due at or before `tick`, moving the wheel there
+        while self.tick < tick:
+            # Jump to the next tick where the lowest non-empty ring releases or
+            # cascades something
+            level = next((level for level, size in enumerate(self.sizes) if size), LEVELS)
+            if level == LEVELS and not self.overflow:
+                self.tick = tick  # nothing left in the wheel
+                break
+            span = SLOTS ** level
+            self.tick = min(tick, (self.tick // span + 1) * span)
+            if level and self.tick % span:
+                break  # reached `tick` before the next cascade
+            if self.tick % SLOTS ** LEVELS == 0:
+                overflow, self.overflow = self.overflow, []
+                for due_tick, key in overflow:
+                    self._place(due_tick, key)
+            # Cascade from the top so a timer can fall through several levels at once
+            for level in range(LEVELS - 1, 0, -1):
+                span = SLOTS ** level
+                if self.tick % span == 0:
+                    ring = self.rings[level]
+                    slot, ring[(self.tick // span) % SLOTS] = ring[(self.tick // span) % SLOTS], []
+                    self.sizes[level] -= len(slot)
+                    for due_tick, key in slot:
+                        self._place(due_tick, key)
+            ring = self.rings[0]
+            slot, ring[self.tick % SLOTS] = ring[self.tick % SLOTS], []
+            self.sizes[0] -= len(slot)
+            self.expired.extend(key for _, key in slot)
+        due, self.expired = self.expired, []
+        return due
+
+def _now() -> int:
+    return int(time.time() * 1000)
+
+# Lines of the log folded so far
+_lines = 0
+# id -> (due, from, to) of every pending progression
+_pending: Dict[str, Tuple[int, str, str]] = {}
+# id -> (due, until) of every pending progression that is leased out
+_leases: Dict[str, Tuple[int, int]] = {}
+_wheel = TimerWheel(_now() // TICK_MS)
+# (id, due) the wheel has released but take_due() has not handed out yet
+_ready: Deque[tuple] = deque()
+_fired = 0
+_lags: Deque[int] = deque(maxlen=LAG_SAMPLES)
+
+def _reset() -> None:
+    global _lines, _pending, _leases, _wheel, _ready, _fired, _lags
+    _lines = 0
+    _pending = {}
+    _leases = {}
+    _wheel = TimerWheel(_now() // TICK_MS)
+    _ready = deque()
+    _fired = 0
+    _lags = deque(maxlen=LAG_SAMPLES)
+
+def _fold(entry: list) -> None:
+    global _lines, _fired
+    _lines += 1
+    if entry[0] == 'add':
+        _, pid, due, from_status, to_status = entry
+        _pending[pid] = (due, from_status, to_status)
+        _leases.pop(pid, None)
+        # Rounded up, so a timer the wheel releases is always due
+        _wheel.add(-(-due // TICK_MS), (pid, due))
+    elif entry[0] == 'lease':
+        _, pid, due, until = entry
+        if pid in _pending and _pending[pid][0] == due:
+            _leases[pid] = (due, until)
+            # Released again when the lease runs out, unless acked by then
+            _wheel.add(-(-until // TICK_MS), (pid, due))
+    elif entry[0] == 'done':
+        _, pid, due, fired_at = entry
+        if pid in _pending and _pending[pid][0] == due:
+            del _pending[pid]
+            _leases.pop(pid, None)
+        _fired += 1
+        _lags.append(max(0, fired_at - due))
+    elif entry[0] == 'stats':
+        _fired += entry[1]
+        _lags.extend(entry[2])
+
+_log = JsonLinesLog(FILE, LOCK_FILE, _fold, _reset)
+
+def _compact() -> None:
+    # Rewrite the log as the pending timers plus the carried-over counters
+    global _lines
+    if _lines < COMPACT_LINES or _lines < 4 * len(_pending):
+        return
+    entries = [['stats', _fired, list(_lags)]]
+    entries += [['add', pid, due, f, t] for pid, (due, f, t) in _pending.items()]
+    entries += [['lease', pid, due, until] for pid, (due, until) in _leases.items()]
+    _log.rewrite(entries)
+    _lines = len(entries)
+
+def schedule(pid: str, from_status: str, to_status: str, due: int) -> None:
+    # Progress pet `pid` from `from_status` to `to_status` at `due` (ms),
+    # replacing any progression already pending for it
+    with _log.writing():
+        _log.append([['add', pid, due, from_status, to_status]])
+        _compact()
+
+def take_due(now: Optional[int] = None, limit: int = BATCH_SIZE) -> List[Dict]:
+    # Up to `limit` due progressions, oldest first, leased to the caller for
+    # LEASE_MS; pass the ones it emitted to ack()
+    now = _now() if now is None else now
+    with _log.writing():
+        _ready.extend(sorted(_wheel.advance(now // TICK_MS), key=lambda key: key[1]))
+        batch = []
+        taken = set()
+        while _ready and len(batch) < limit:
+            pid, due = _ready.popleft()
+            pending = _pending.get(pid)
+            lease = _leases.get(pid)
+            if pending is None or pending[0] != due or (lease is not None and lease[0] == due and lease[1] > now):
+                continue  # replaced, fired or still leased out
+            if pid in taken:
+                continue  # released again by an earlier lease's expiry
+            taken.add(pid)
+            batch.append({'petId': pid, 'from': pending[1], 'to': pending[2], 'due': due})
+        if batch:
+            _log.append([['lease', item['petId'], item['due'], now + LEASE_MS] for item in batch])
+            _compact()
+        return batch
+
+def ack(items: List[Dict], now: Optional[int] = None) -> None:
+    # Progressions from take_due() that were emitted; they are done for good
+    if not items:
+        return
+    now = _now() if now is None else now
+    with _log.writing():
+        _log.append([['done', item['petId'], item['due'], now] for item in items])
+        _compact()
+
+def pending() -> int:
+    with _log.reading():
+        return len(_pending)
+
+def stats(now: Optional[int] = None) -> Dict:
+    # Queue depth and firing lag: pending/overdue timers, fired so far and the
+    # lag percentiles over the last LAG_SAMPLES firings
+    now = _now() if now is None else now
+    with _log.reading():
+        dues = sorted(due for due, _, _ in _pending.values())
+        lags = sorted(_lags)
+        return {
+            'pending': len(dues),
+            'overdue': bisect.bisect_right(dues, now),
+            'leased': sum(1 for _, until in _leases.values() if until > now),
+            'oldestOverdueMs': now - dues[0] if dues and dues[0] <= now else 0,
+            'fired': _fired,
+            'lagMs': {'p50': percentile(lags, 50), 'p99': percentile(lags, 99), 'max': lags[-1]} if lags else None,
+            'tickMs': TICK_MS,
+        }
@@ -0,0 +1,29 @@
+# src/services/request_params.py
+# Request parsing shared by the Python API steps, reached through
+# bootstrap.services.request. Query parameters and headers may arrive as a
+# single string or as a list of strings.
+from typing import Optional, Set
+
+def query_param(req, name: str) -> Optional[str]:
+    # First value of ?name=, None when absent
+    value = (req.get("queryParams") or {}).get(name)
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return value
+
+def query_fields(req) -> Optional[Set[str]]:
+    # ?fields=id,name,status -> set of field names; None returns every field
+    value = query_param(req, "fields")
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+def etag_matches(req, etag: str) -> bool:
+    # If-None-Match holds one or more (possibly weak) tags, or *
+    header = (req.get("headers") or {}).get("if-none-match")
+    if isinstance(header, list):
+        header = ",".join(header)
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
@@ -0,0 +1,27 @@
+# src/services/scratch.py
+# The store and the logs next to it resolve .data from the cwd at import time.
+# Self-tests and benchmarks therefore re-run their own module with --worker in
+# a fresh process whose cwd is a throwaway directory, so the project's .data
+# is never touched:
+#
+#   if args[:1] == ['--worker']:
+#       ...                                  # runs inside the scratch directory
+#   code = run_worker('src.services.pet_stats', ['1000', '500']).returncode
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def run_worker(module: str, args: List[str], **kwargs) -> subprocess.CompletedProcess:
+    # `python -m <module> --worker <args>` in a scratch directory, removed
+    # afterwards; kwargs go to subprocess.run
+    scratch = tempfile.mkdtemp(prefix=module.rsplit('.', 1)[-1].replace('_', '-') + '-')
+    try:
+        env = {**os.environ, 'PYTHONPATH': ROOT + os.pathsep + os.environ.get('PYTHONPATH', '')}
+        return subprocess.run([sys.executable, '-m', module, '--worker', *args], cwd=scratch, env=env, **kwargs)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
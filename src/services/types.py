@@ -1,5 +1,5 @@
 # src/services/types.py
-from typing import TypedDict, Literal, Optional, List
+from typing import TypedDict, Literal, Optional, List, Dict, get_args
 
 Species = Literal['dog','cat','bird','other']
 Status = Literal['new','in_quarantine','healthy','available','pending','adopted','ill','under_treatment','recovered','deleted']
@@ -23,3 +23,53 @@ class Pet(TypedDict, total=False):
     deletedAt: int
     purgeAt: int
     profile: PetProfile
+    weightKg: float
+    symptoms: List[str]
+    flags: List[str]
+    version: int
+
+# Field names accepted by the `fields` projection of get()/list_all()
+PET_FIELDS = frozenset(Pet.__annotations__)
+
+PET_SPECIES = frozenset(get_args(Species))
+PET_STATUSES = frozenset(get_args(Status))
+
+# Conditions of a filtered list_all()/list_page(); all given ones must hold
+class PetFilter(TypedDict, total=False):
+    status: Status
+    species: Species
+    minAgeMonths: int
+    maxAgeMonths: int
+
+# GET /py/pets/stats; byStatus counts every pet, the rest leave out soft-deleted ones
+class PetStats(TypedDict):
+    total: int
+    byStatus: Dict[str, int]
+    bySpecies: Dict[str, int]
+    averageAgeMonths: Optional[float]
+
+# Result of pet_store.check_stats(). 'inconclusive' when writes kept landing
+# during the recount; drift lists {counter, maintained, recomputed}.
+class PetStatsCheck(TypedDict):
+    result: Literal['ok', 'drift', 'inconclusive']
+    attempts: int
+    drift: List[Dict]
+
+class PetPage(TypedDict):
+    items: List[Pet]
+    nextCursor: Optional[str]
+
+class PetSearchHit(TypedDict):
+    score: float
+    pet: Pet
+
+class PetChange(TypedDict):
+    seq: int
+    op: Literal['create','update','delete']
+    id: str
+    fields: List[str]
+
+class PetChangePage(TypedDict):
+    changes: List[PetChange]
+    nextSince: int
+    reset: bool
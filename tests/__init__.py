@@ -0,0 +1,2 @@
+# tests/__init__.py
+# Regression tests for the Python services: python -m unittest discover tests
@@ -0,0 +1,177 @@
+# tests/test_pet_store_concurrency.py
+# Multi-process regression tests for pet_store. Every scenario runs through
+# scratch.run_worker: this module re-runs itself with --worker in a throwaway
+# directory, and the worker starts further processes (--child) in that same
+# directory, so they share one .data and the project's own is never touched.
+#
+#   python -m unittest tests.test_pet_store_concurrency
+import json
+import os
+import subprocess
+import sys
+import unittest
+from typing import List
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock to hold
+    fcntl = None
+
+from src.services.scratch import run_worker
+
+MODULE = 'tests.test_pet_store_concurrency'
+BACKENDS = ('json', 'log', 'sharded', 'sqlite')
+WRITERS = 4
+# Flags added and pets created by each writer
+ROUNDS = 25
+TIMEOUT_S = 300
+
+def _spawn(*args: str) -> subprocess.Popen:
+    # Another process in the worker's scratch directory, same environment
+    return subprocess.Popen([sys.executable, '-m', MODULE, '--child', *args], stdout=subprocess.PIPE, text=True)
+
+def _child(*args: str) -> str:
+    out, _ = _spawn(*args).communicate(timeout=TIMEOUT_S)
+    return out.strip()
+
+def _wait(children: List[subprocess.Popen]) -> List[str]:
+    outputs = []
+    for child in children:
+        out, _ = child.communicate(timeout=TIMEOUT_S)
+        assert child.returncode == 0, f'child exited with {child.returncode}'
+        outputs.append(out.strip())
+    return outputs
+
+# --- children: one store operation each, result on stdout ---
+
+def _writer(pid: str, n: str) -> None:
+    # Read-modify-write of one shared pet, interleaved with creates
+    from src.services import pet_store
+    created = []
+    for i in range(ROUNDS):
+        pet_store.add_flag(pid, f'{n}-{i}')
+        created.append(pet_store.create(f'Pet {n}-{i}', 'cat', i)['id'])
+    print(json.dumps(created))
+
+def _reader(stop_file: str) -> None:
+    # list_all() in a loop until told to stop; never holds the store lock
+    from src.services import pet_store
+    reads = 0
+    while not os.path.exists(stop_file):
+        pet_store.list_all(('id',))
+        reads += 1
+    print(reads)
+
+def _count() -> None:
+    from src.services import pet_store
+    print(len(pet_store.list_all(('id',))))
+
+def _create() -> None:
+    from src.services import pet_store
+    print(pet_store.create('Late', 'dog', 1)['id'])
+
+CHILDREN = {'writer': _writer, 'reader': _reader, 'count': _count, 'create': _create}
+
+# --- workers: one scenario each, failing with an AssertionError ---
+
+def _lost_updates(backend: str) -> None:
+    from src.services import pet_store
+    pid = pet_store.create('Shared', 'dog', 1)['id']
+    outputs = _wait([_spawn('writer', pid, str(n)) for n in range(WRITERS)])
+    flags = pet_store.get(pid)['flags']
+    expected = {f'{n}-{i}' for n in range(WRITERS) for i in range(ROUNDS)}
+    assert sorted(flags) == sorted(expected), f'{backend}: lost {len(expected - set(flags))} flag updates'
+    created = [pid for out in outputs for pid in json.loads(out)]
+    assert len(set(created)) == len(created), f'{backend}: duplicate ids handed out'
+    stored = {pet['id'] for pet in pet_store.list_all(('id',))}
+    assert set(created) <= stored, f'{backend}: {len(set(created) - stored)} created pets missing'
+
+def _torn_log() -> None:
+    # A reader that catches a locked writer mid-append must not cut the
+    # record off; a tail torn by a crashed writer is dropped by the next
+    # locked append, not by readers
+    from src.services import pet_store
+    for n in range(3):
+        pet_store.create(f'Pet {n}', 'dog', n)
+    pet = pet_store.get('1')
+    record = {'seq': 10, 'version': 10, 'id': 'torn', 'set': {**pet, 'id': 'torn', 'name': 'Torn', 'version': 10}}
+    data = (json.dumps(record) + '\n').encode()
+    size = os.path.getsize(pet_store.LOG_FILE)
+
+    fd = os.open(pet_store.LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        with open(pet_store.LOG_FILE, 'ab') as f:
+            f.write(data[:len(data) // 2])
+            f.flush()
+            assert _child('count') == '3', 'reader saw a half-written record'
+            assert os.path.getsize(pet_store.LOG_FILE) == size + len(data) // 2, 'reader truncated the log'
+            f.write(data[len(data) // 2:])
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+    assert _child('count') == '4', 'committed record lost'
+
+    with open(pet_store.LOG_FILE, 'ab') as f:
+        f.write(b'{"seq": 99, "id')
+    assert _child('count') == '4', 'torn tail not skipped'
+    late = _child('create')
+    assert _child('count') == '5', 'append after a torn tail not replayed'
+    ids = {p['id'] for p in pet_store.list_all(('id',))}
+    assert {'torn', late} <= ids, f'missing pets: {sorted({"torn", late} - ids)}'
+
+def _readers_during_writes() -> None:
+    # Writers append (and compact) while unlocked readers replay the log
+    from src.services import pet_store
+    pid = pet_store.create('Shared', 'dog', 1)['id']
+    stop_file = os.path.abspath('stop')
+    readers = [_spawn('reader', stop_file) for _ in range(2)]
+    writers = [_spawn('writer', pid, str(n)) for n in range(WRITERS)]
+    try:
+        outputs = _wait(writers)
+    finally:
+        open(stop_file, 'w').close()
+        _wait(readers)
+    created = {pid for out in outputs for pid in json.loads(out)}
+    stored = {pet['id'] for pet in pet_store.list_all(('id',))}
+    assert created <= stored, f'{len(created - stored)} committed pets lost'
+    assert len(pet_store.get(pid)['flags']) == WRITERS * ROUNDS, 'flag updates lost'
+    assert _child('count') == str(len(created) + 1), 'a fresh process sees a different store'
+
+WORKERS = {'lost-updates': _lost_updates, 'torn-log': _torn_log, 'readers-during-writes': _readers_during_writes}
+
+class PetStoreConcurrencyTest(unittest.TestCase):
+    def run_scenario(self, scenario: str, backend: str, **env: str) -> None:
+        proc = run_worker(MODULE, [scenario, backend, json.dumps(env)],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=TIMEOUT_S)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
+    @unittest.skipIf(fcntl is None, 'needs cross-process file locks')
+    def test_no_lost_updates_across_processes(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                self.run_scenario('lost-updates', backend)
+
+    @unittest.skipIf(fcntl is None, 'needs cross-process file locks')
+    def test_no_lost_updates_with_binary_codec(self):
+        self.run_scenario('lost-updates', 'json', PET_STORE_CODEC='binary')
+
+    @unittest.skipIf(fcntl is None, 'needs cross-process file locks')
+    def test_reader_never_truncates_log(self):
+        self.run_scenario('torn-log', 'log')
+
+    @unittest.skipIf(fcntl is None, 'needs cross-process file locks')
+    def test_log_readers_during_writes_and_compaction(self):
+        self.run_scenario('readers-during-writes', 'log', PET_STORE_LOG_COMPACT_RECORDS='40')
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['--worker']:
+        # The store reads its configuration at import time, and the children
+        # inherit it
+        os.environ['PET_STORE_BACKEND'] = args[2]
+        os.environ.update(json.loads(args[3]))
+        WORKERS[args[1]](*([args[2]] if args[1] == 'lost-updates' else []))
+    elif args[:1] == ['--child']:
+        CHILDREN[args[1]](*args[2:])
+    else:
+        unittest.main()